@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lichhen',
+            index=models.Index(fields=['trang_thai', 'ngay_kham'], name='lich_hen_tt_ngay_idx'),
+        ),
+    ]
@@ -95,6 +95,10 @@ class LichHen(models.Model):
                 name='unique_doctor_appointment_time'
             )
         ]
+        indexes = [
+            # Status breakdowns over a date range (appointment statistics)
+            models.Index(fields=['trang_thai', 'ngay_kham'], name='lich_hen_tt_ngay_idx'),
+        ]
     
     def __str__(self):
         return f"{self.ma_benh_nhan.ho_ten} - {self.ma_bac_si.ho_ten} - {self.ngay_kham}"
@@ -0,0 +1,34 @@
+import os
+import sys
+
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self):
+        if self._should_warm_health_cache():
+            from django.core.signals import request_started
+            from .health_checks import start_health_cache_warmer
+            request_started.connect(
+                start_health_cache_warmer,
+                dispatch_uid='core.health_cache_warmer'
+            )
+
+    @staticmethod
+    def _should_warm_health_cache():
+        """
+        Warm only when HEALTH_CHECK_WARMUP is enabled (off by default), and
+        then only in serving processes, never in the autoreloader parent or
+        other management commands. The warmer itself starts on each
+        process's first request.
+        """
+        if not getattr(settings, 'HEALTH_CHECK_WARMUP', False):
+            return False
+        if 'runserver' in sys.argv:
+            return os.environ.get('RUN_MAIN') == 'true'
+        # Application servers (gunicorn, uwsgi, ...) are not manage.py commands
+        return not sys.argv[0].endswith('manage.py')
@@ -3,13 +3,16 @@ Dependency Injection container for the Hospital Management System.
 Implements IoC (Inversion of Control) for better testability and flexibility.
 """
 
-from typing import Dict, Type, Any, Optional, Callable
+from typing import Dict, Type, Any, Optional, Callable, Iterable, Tuple
 from abc import ABC, abstractmethod
 import inspect
 import logging
 
 logger = logging.getLogger(__name__)
 
+_EMPTY = inspect.Parameter.empty
+_VARIADIC = (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)
+
 
 class ServiceNotFoundError(Exception):
     """Exception raised when a service is not found in the container."""
@@ -54,6 +57,7 @@ class ServiceContainer(IServiceContainer):
         self._services: Dict[str, Dict[str, Any]] = {}
         self._singletons: Dict[str, Any] = {}
         self._resolving: set = set()
+        self._init_plans: Dict[Type, Tuple[Tuple[str, bool, Any, bool, Any], ...]] = {}
         
     def register(self, name: str, factory: Callable = None, 
                  singleton: bool = False, interface: Type = None):
@@ -85,6 +89,27 @@ class ServiceContainer(IServiceContainer):
         }
         logger.debug(f"Registered service: {name} (singleton={singleton})")
         
+    def register_many(self, services: Iterable[Tuple[str, Callable]],
+                      singleton: bool = False, interface: Type = None):
+        """
+        Register several services sharing the same lifetime in one pass.
+        
+        Args:
+            services: Iterable of (name, factory) pairs
+            singleton: Whether to create single instances
+            interface: Interface the services implement
+        """
+        registered = {
+            name: {
+                'factory': factory,
+                'singleton': singleton,
+                'interface': interface
+            }
+            for name, factory in services
+        }
+        self._services.update(registered)
+        logger.debug(f"Registered {len(registered)} services (singleton={singleton})")
+        
     def register_instance(self, name: str, instance: Any):
         """
         Register an existing instance as a singleton.
@@ -150,6 +175,65 @@ class ServiceContainer(IServiceContainer):
         finally:
             self._resolving.remove(name)
     
+    def _get_init_plan(self, cls: Type) -> Tuple[Tuple[str, bool, Any, bool, Any], ...]:
+        """
+        Get the cached constructor parameter plan for a class.
+        
+        Args:
+            cls: Class to inspect
+            
+        Returns:
+            Tuple of (name, has_annotation, annotation, has_default, default)
+            for each constructor parameter
+        """
+        plan = self._init_plans.get(cls)
+        if plan is None:
+            sig = inspect.signature(cls.__init__)
+            plan = tuple(
+                (param_name,
+                 param.annotation is not _EMPTY, param.annotation,
+                 param.default is not _EMPTY, param.default)
+                for param_name, param in sig.parameters.items()
+                if param_name != 'self' and param.kind not in _VARIADIC
+            )
+            self._init_plans[cls] = plan
+        return plan
+    
+    def warm_up(self):
+        """
+        Precompute constructor plans for all registered classes.
+        Should be called once after all providers have registered.
+        """
+        for config in self._services.values():
+            factory = config['factory']
+            if inspect.isclass(factory):
+                self._get_init_plan(factory)
+        logger.debug(f"Prepared constructor plans for {len(self._init_plans)} services")
+    
+    def validate(self):
+        """
+        Verify that every registered class can have its constructor satisfied.
+        
+        Raises:
+            ServiceNotFoundError: If a required dependency is not registered
+        """
+        missing = []
+        for name, config in self._services.items():
+            factory = config['factory']
+            if not inspect.isclass(factory):
+                continue
+            for param_name, has_annotation, annotation, has_default, _ in self._get_init_plan(factory):
+                if self.has(param_name) or has_default:
+                    continue
+                if has_annotation and self._find_service_by_type(annotation):
+                    continue
+                missing.append(f"{name}.{param_name}")
+        
+        if missing:
+            raise ServiceNotFoundError(
+                f"Unresolvable constructor dependencies: {', '.join(missing)}"
+            )
+    
     def _create_with_dependencies(self, cls: Type) -> Any:
         """
         Create instance with automatic dependency injection.
@@ -160,25 +244,20 @@ class ServiceContainer(IServiceContainer):
         Returns:
             Class instance with injected dependencies
         """
-        # Get constructor signature
-        sig = inspect.signature(cls.__init__)
         kwargs = {}
         
-        for param_name, param in sig.parameters.items():
-            if param_name == 'self':
-                continue
-            
+        for param_name, has_annotation, annotation, has_default, default in self._get_init_plan(cls):
             # Try to resolve by parameter name
             if self.has(param_name):
                 kwargs[param_name] = self.resolve(param_name)
             # Try to resolve by type annotation
-            elif param.annotation != param.empty:
-                service_name = self._find_service_by_type(param.annotation)
+            elif has_annotation:
+                service_name = self._find_service_by_type(annotation)
                 if service_name:
                     kwargs[param_name] = self.resolve(service_name)
             # Use default if available
-            elif param.default != param.empty:
-                kwargs[param_name] = param.default
+            elif has_default:
+                kwargs[param_name] = default
         
         return cls(**kwargs)
     
@@ -225,6 +304,7 @@ class ServiceContainer(IServiceContainer):
         self._services.clear()
         self._singletons.clear()
         self._resolving.clear()
+        self._init_plans.clear()
         logger.debug("Cleared all services from container")
 
 
@@ -251,7 +331,7 @@ def inject(func: Callable) -> Callable:
                 if container.has(param_name):
                     kwargs[param_name] = container.resolve(param_name)
                 # Try to resolve by type annotation
-                elif param.annotation != param.empty:
+                elif param.annotation is not _EMPTY:
                     service_name = container._find_service_by_type(param.annotation)
                     if service_name:
                         kwargs[param_name] = container.resolve(service_name)
@@ -306,16 +386,18 @@ class RepositoryServiceProvider(ServiceProvider):
         )
         
         # Register repositories as singletons
-        self.container.register('user_repository', UserRepository, singleton=True)
-        self.container.register('patient_repository', PatientRepository, singleton=True)
-        self.container.register('facility_repository', MedicalFacilityRepository, singleton=True)
-        self.container.register('doctor_repository', DoctorRepository, singleton=True)
-        self.container.register('specialty_repository', SpecialtyRepository, singleton=True)
-        self.container.register('service_repository', ServiceRepository, singleton=True)
-        self.container.register('appointment_repository', AppointmentRepository, singleton=True)
-        self.container.register('schedule_repository', ScheduleRepository, singleton=True)
-        self.container.register('teleconsultation_repository', TeleconsultationRepository, singleton=True)
-        self.container.register('payment_repository', PaymentRepository, singleton=True)
+        self.container.register_many((
+            ('user_repository', UserRepository),
+            ('patient_repository', PatientRepository),
+            ('facility_repository', MedicalFacilityRepository),
+            ('doctor_repository', DoctorRepository),
+            ('specialty_repository', SpecialtyRepository),
+            ('service_repository', ServiceRepository),
+            ('appointment_repository', AppointmentRepository),
+            ('schedule_repository', ScheduleRepository),
+            ('teleconsultation_repository', TeleconsultationRepository),
+            ('payment_repository', PaymentRepository),
+        ), singleton=True)
 
 
 class ServiceLayerProvider(ServiceProvider):
@@ -328,8 +410,10 @@ class ServiceLayerProvider(ServiceProvider):
         from core.services.user_service import UserService, PatientService
         
         # Register services
-        self.container.register('user_service', UserService, singleton=False)
-        self.container.register('patient_service', PatientService, singleton=False)
+        self.container.register_many((
+            ('user_service', UserService),
+            ('patient_service', PatientService),
+        ), singleton=False)
 
 
 class DependencyInjectionMiddleware:
@@ -367,6 +451,10 @@ def setup_dependency_injection():
     for provider in providers:
         provider.boot()
     
+    # Build constructor plans up front and fail fast on missing dependencies
+    container.warm_up()
+    container.validate()
+    
     logger.info("Dependency injection container initialized")
 
 
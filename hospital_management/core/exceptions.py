@@ -6,12 +6,23 @@ Provides structured error responses and centralized exception management.
 from typing import Dict, Any, Optional, List
 from rest_framework.views import exception_handler
 from rest_framework.exceptions import APIException
+from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import IntegrityError
-from django.http import Http404
+from django.http import Http404, HttpResponse, JsonResponse
 import logging
-import traceback
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from sentry_sdk import capture_exception as _sentry_capture
+except ImportError:
+    _sentry_capture = None
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +36,13 @@ class BaseApplicationException(APIException):
     status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
     default_detail = 'An error occurred'
     default_code = 'error'
+    _type_name = 'BaseApplicationException'
+    _has_field_errors = False
+    
+    def __init_subclass__(cls, **kwargs):
+        """Cache the class name used in error responses."""
+        super().__init_subclass__(**kwargs)
+        cls._type_name = cls.__name__
     
     def __init__(self, detail: Any = None, code: str = None, 
                  context: Optional[Dict[str, Any]] = None):
@@ -38,6 +56,26 @@ class BaseApplicationException(APIException):
         """
         super().__init__(detail or self.default_detail, code or self.default_code)
         self.context = context or {}
+        # Structured details (field errors) are only stringified on demand
+        self._str_detail = None if isinstance(self.detail, (dict, list)) else str(self.detail)
+    
+    @classmethod
+    def _template_response(cls) -> Dict[str, Any]:
+        """
+        Get an error response for this class with the default detail.
+        
+        Returns:
+            Fresh response dictionary built from a per-class cached template
+        """
+        template = cls.__dict__.get('_error_template')
+        if template is None:
+            template = {
+                'code': cls.default_code,
+                'message': str(cls.default_detail),
+                'type': cls._type_name,
+            }
+            cls._error_template = template
+        return {'success': False, 'error': template.copy()}
 
 
 # Business Logic Exceptions
@@ -102,6 +140,7 @@ class ValidationException(BaseApplicationException):
     status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
     default_detail = 'Validation failed'
     default_code = 'validation_error'
+    _has_field_errors = True
     
     def __init__(self, errors: Dict[str, List[str]], code: str = None):
         """
@@ -161,6 +200,13 @@ class TransactionException(DatabaseException):
     default_code = 'transaction_error'
 
 
+class ConcurrencyException(DatabaseException):
+    """Exception for concurrent modification conflicts."""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Resource was modified by another request'
+    default_code = 'concurrency_conflict'
+
+
 # Rate Limiting Exception
 class RateLimitExceededException(BaseApplicationException):
     """Exception for rate limit exceeded."""
@@ -169,6 +215,109 @@ class RateLimitExceededException(BaseApplicationException):
     default_code = 'rate_limit_exceeded'
 
 
+# Exception types defined here, checked by identity before the isinstance fallback
+_APP_EXC_TYPES = frozenset((
+    BaseApplicationException,
+    BusinessLogicException,
+    ResourceNotFoundException,
+    DuplicateResourceException,
+    InvalidOperationException,
+    AuthenticationException,
+    AuthorizationException,
+    TokenExpiredException,
+    InvalidTokenException,
+    ValidationException,
+    InvalidInputException,
+    ExternalServiceException,
+    PaymentGatewayException,
+    EmailServiceException,
+    SMSServiceException,
+    DatabaseException,
+    TransactionException,
+    ConcurrencyException,
+    RateLimitExceededException,
+))
+
+
+def _convert_django_validation_error(exc):
+    """Convert a Django ValidationError into a ValidationException."""
+    return ValidationException(exc.message_dict if hasattr(exc, 'message_dict') else {'detail': str(exc)})
+
+
+# Django exceptions translated to application exceptions, keyed by type
+_EXC_CONVERTERS = {
+    Http404: lambda exc: ResourceNotFoundException('Resource not found'),
+    DjangoValidationError: _convert_django_validation_error,
+    IntegrityError: lambda exc: DuplicateResourceException('Data integrity violation'),
+}
+
+
+def _convert_exception(exc):
+    """
+    Translate Django exceptions to application exceptions.
+    
+    Args:
+        exc: Exception instance
+        
+    Returns:
+        Converted exception, or the original one if no conversion applies
+    """
+    exc_type = type(exc)
+    if exc_type in _APP_EXC_TYPES:
+        return exc
+    converter = _EXC_CONVERTERS.get(exc_type)
+    if converter is None:
+        # DRF exceptions never derive from the Django ones, skip the sweep
+        if isinstance(exc, APIException):
+            return exc
+        for exc_type, candidate in _EXC_CONVERTERS.items():
+            if isinstance(exc, exc_type):
+                converter = candidate
+                break
+        else:
+            return exc
+    return converter(exc)
+
+
+def _build_error_response(code: str, message: Any, type_name: str) -> Dict[str, Any]:
+    """
+    Build the common error response envelope.
+    
+    Args:
+        code: Error code for client identification
+        message: Error message
+        type_name: Exception type name
+        
+    Returns:
+        Error response dictionary
+    """
+    return {
+        'success': False,
+        'error': {'code': code, 'message': message, 'type': type_name},
+    }
+
+
+def _optional_error_fields(exc: BaseApplicationException, request_id: Any) -> Dict[str, Any]:
+    """
+    Collect the optional error fields present on an application exception.
+    
+    Args:
+        exc: Application exception
+        request_id: Current request ID or None
+        
+    Returns:
+        Dictionary with any of fields/context/request_id, usually empty
+    """
+    extra = {}
+    if exc._has_field_errors:
+        extra['fields'] = exc.field_errors
+    if exc.context:
+        extra['context'] = exc.context
+    if request_id is not None:
+        extra['request_id'] = request_id
+    return extra
+
+
 def custom_exception_handler(exc, context):
     """
     Custom exception handler for REST framework.
@@ -187,55 +336,46 @@ def custom_exception_handler(exc, context):
     # Get request information
     request = context.get('request')
     view = context.get('view')
+    request_id = getattr(request, 'id', None) if request else None
     
     # Log the exception
     if request:
         logger.error(
-            f"Exception in {view.__class__.__name__ if view else 'Unknown'}: "
-            f"{request.method} {request.path}",
+            "Exception in %s: %s %s",
+            view.__class__.__name__ if view else 'Unknown',
+            request.method,
+            request.path,
             exc_info=exc,
             extra={
-                'request_id': getattr(request, 'id', None),
+                'request_id': request_id,
                 'user': getattr(request, 'user', None),
                 'data': getattr(request, 'data', None),
             }
         )
     
     # Handle Django exceptions
-    if isinstance(exc, Http404):
-        exc = ResourceNotFoundException('Resource not found')
-    elif isinstance(exc, DjangoValidationError):
-        exc = ValidationException(exc.message_dict if hasattr(exc, 'message_dict') else {'detail': str(exc)})
-    elif isinstance(exc, IntegrityError):
-        exc = DuplicateResourceException('Data integrity violation')
+    exc = _convert_exception(exc)
     
     # Format response for custom exceptions
-    if isinstance(exc, BaseApplicationException):
-        error_response = {
-            'success': False,
-            'error': {
-                'code': exc.default_code,
-                'message': str(exc.detail),
-                'type': exc.__class__.__name__,
-            }
-        }
-        
-        # Add field errors for validation exceptions
-        if isinstance(exc, ValidationException) and hasattr(exc, 'field_errors'):
-            error_response['error']['fields'] = exc.field_errors
-        
-        # Add context if available
-        if exc.context:
-            error_response['error']['context'] = exc.context
+    if type(exc) in _APP_EXC_TYPES or isinstance(exc, BaseApplicationException):
+        if not exc.context and exc._str_detail == exc.default_detail:
+            # Default message, reuse the cached per-class envelope
+            error_response = exc._template_response()
+        else:
+            error_response = _build_error_response(
+                exc.default_code,
+                exc._str_detail if exc._str_detail is not None else str(exc.detail),
+                exc._type_name,
+            )
+        error = error_response['error']
         
-        # Add request ID for tracking
-        if request and hasattr(request, 'id'):
-            error_response['error']['request_id'] = request.id
+        # Add field errors, context and request ID when present
+        error.update(_optional_error_fields(exc, request_id))
         
         # Add debug information in development
-        from django.conf import settings
         if settings.DEBUG:
-            error_response['error']['debug'] = {
+            import traceback
+            error['debug'] = {
                 'traceback': traceback.format_exc(),
                 'view': view.__class__.__name__ if view else None,
                 'path': request.path if request else None,
@@ -245,45 +385,36 @@ def custom_exception_handler(exc, context):
         if response:
             response.data = error_response
         else:
-            from rest_framework.response import Response
             response = Response(error_response, status=exc.status_code)
     
     # Handle standard DRF exceptions
     elif response is not None:
-        error_response = {
-            'success': False,
-            'error': {
-                'code': getattr(exc, 'default_code', 'error'),
-                'message': response.data.get('detail', str(exc)) if isinstance(response.data, dict) else str(response.data),
-                'type': exc.__class__.__name__,
-            }
-        }
+        error_response = _build_error_response(
+            getattr(exc, 'default_code', 'error'),
+            response.data.get('detail', str(exc)) if isinstance(response.data, dict) else str(response.data),
+            exc.__class__.__name__,
+        )
         
-        if request and hasattr(request, 'id'):
-            error_response['error']['request_id'] = request.id
+        if request_id is not None:
+            error_response['error']['request_id'] = request_id
         
         response.data = error_response
     
     # Handle unexpected exceptions
     else:
-        logger.error(f"Unhandled exception: {exc}", exc_info=True)
+        logger.error("Unhandled exception: %s", exc, exc_info=True)
         
-        from rest_framework.response import Response
-        error_response = {
-            'success': False,
-            'error': {
-                'code': 'internal_error',
-                'message': 'An unexpected error occurred',
-                'type': 'InternalServerError',
-            }
-        }
+        error_response = _build_error_response(
+            'internal_error', 'An unexpected error occurred', 'InternalServerError'
+        )
+        error = error_response['error']
         
-        if request and hasattr(request, 'id'):
-            error_response['error']['request_id'] = request.id
+        if request_id is not None:
+            error['request_id'] = request_id
         
-        from django.conf import settings
         if settings.DEBUG:
-            error_response['error']['debug'] = {
+            import traceback
+            error['debug'] = {
                 'exception': str(exc),
                 'traceback': traceback.format_exc(),
             }
@@ -293,6 +424,23 @@ def custom_exception_handler(exc, context):
     return response
 
 
+def _fast_json_response(payload: Dict[str, Any], status_code: int) -> HttpResponse:
+    """
+    Build a JSON response, encoding with orjson when it is installed.
+    
+    Args:
+        payload: Response body
+        status_code: HTTP status code
+        
+    Returns:
+        HttpResponse with JSON content
+    """
+    if orjson is None:
+        return JsonResponse(payload, status=status_code)
+    return HttpResponse(orjson.dumps(payload), status=status_code,
+                        content_type='application/json')
+
+
 class ExceptionMiddleware:
     """
     Middleware for handling exceptions at the application level.
@@ -307,7 +455,8 @@ class ExceptionMiddleware:
             response = self.get_response(request)
         except Exception as e:
             logger.error(
-                f"Unhandled exception in middleware: {e}",
+                "Unhandled exception in middleware: %s",
+                e,
                 exc_info=True,
                 extra={
                     'request_path': request.path,
@@ -320,25 +469,23 @@ class ExceptionMiddleware:
             self._send_to_monitoring(e, request)
             
             # Return error response
-            from django.http import JsonResponse
-            return JsonResponse({
+            return _fast_json_response({
                 'success': False,
                 'error': {
                     'code': 'internal_error',
                     'message': 'An unexpected error occurred',
                     'request_id': getattr(request, 'id', None),
                 }
-            }, status=500)
+            }, status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         return response
     
     def _send_to_monitoring(self, exception, request):
         """Send exception to monitoring service."""
+        # Integrate with Sentry or other monitoring service
+        if _sentry_capture is None or not getattr(settings, 'SENTRY_DSN', None):
+            return
         try:
-            # Integrate with Sentry or other monitoring service
-            from django.conf import settings
-            if hasattr(settings, 'SENTRY_DSN') and settings.SENTRY_DSN:
-                import sentry_sdk
-                sentry_sdk.capture_exception(exception)
+            _sentry_capture(exception)
         except Exception:
             pass  # Don't let monitoring failures break the application
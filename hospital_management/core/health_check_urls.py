@@ -13,6 +13,12 @@ from .health_checks import (
 
 app_name = 'health'
 
+# Kubernetes probes, the only health routes safe to expose without authentication
+probe_urlpatterns = [
+    path('live/', liveness_probe, name='liveness-probe'),
+    path('ready/', readiness_probe, name='readiness-probe'),
+]
+
 urlpatterns = [
     # Basic health check
     path('', health_check, name='health-check'),
@@ -21,8 +27,7 @@ urlpatterns = [
     path('detailed/', health_check_detailed, name='health-check-detailed'),
     
     # Kubernetes probes
-    path('live/', liveness_probe, name='liveness-probe'),
-    path('ready/', readiness_probe, name='readiness-probe'),
+    *probe_urlpatterns,
     
     # Metrics endpoint
     path('metrics/', metrics_endpoint, name='metrics'),
@@ -3,36 +3,370 @@ Health check endpoints and system metrics for Hospital Management System.
 Provides comprehensive health monitoring and status reporting.
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable
+from collections import Counter, defaultdict, deque, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-from django.db import connection
+from itertools import chain
+from django.db import close_old_connections, connection
 from django.core.cache import cache
+from django.core.mail import get_connection
 from django.conf import settings
 from django.utils import timezone
+from django.http import HttpResponse
+from django.views.decorators.cache import never_cache
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 import psutil
+import functools
 import logging
 import os
+import socket
+import threading
+import time
+
+try:
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
 
 logger = logging.getLogger(__name__)
 
+# Byte unit divisors
+_GB = 1 << 30
+_MB = 1 << 20
 
-class HealthCheckService:
+# Seconds a computed health status is reused before checks run again
+HEALTH_STATUS_TTL = 5
+
+
+class TTLCache:
     """
-    Service for performing health checks on various system components.
+    Thread-safe in-process cache whose entries expire after a fixed TTL.
     """
     
+    def __init__(self, ttl: float):
+        """
+        Initialize the cache.
+        
+        Args:
+            ttl: Entry lifetime in seconds
+        """
+        self.ttl = ttl
+        self._entries: Dict[Any, tuple] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: Any) -> Optional[Any]:
+        """
+        Get a cached value.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            return entry[1]
+        return None
+    
+    def set(self, key: Any, value: Any):
+        """
+        Store a value for the configured TTL.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+    
+    def clear(self):
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+def ttl_cache(seconds: float) -> Callable:
+    """
+    Cache a health check method's result for a short time.
+    Concurrent callers of an expired entry wait for a single computation.
+    
+    Args:
+        seconds: How long a result is reused
+        
+    Returns:
+        Method decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        results = TTLCache(seconds)
+        refresh_lock = threading.Lock()
+        key = func.__name__
+        
+        @functools.wraps(func)
+        def wrapper(self):
+            result = results.get(key)
+            if result is not None:
+                return result
+            
+            with refresh_lock:
+                # Another caller may have refreshed it while we waited
+                result = results.get(key)
+                if result is None:
+                    result = func(self)
+                    results.set(key, result)
+            return result
+        
+        wrapper.cache = results
+        return wrapper
+    return decorator
+
+
+# Recent health status results keyed by the detailed flag
+_health_status_cache = TTLCache(HEALTH_STATUS_TTL)
+
+# Seconds a concurrent caller waits for an in-flight health run
+HEALTH_INFLIGHT_WAIT = 5
+
+
+class _InflightRun:
+    """One in-progress health run; result stays None if the run failed."""
+    
     def __init__(self):
-        self.checks = {
-            'database': self.check_database,
-            'cache': self.check_cache,
-            'disk': self.check_disk_space,
-            'memory': self.check_memory,
-            'external_services': self.check_external_services,
-        }
+        self.done = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+
+
+# In-flight health runs keyed like the status cache, so concurrent probes share one run
+_inflight: Dict[Any, _InflightRun] = {}
+_inflight_lock = threading.Lock()
+
+# Seconds to wait for all health checks together before failing the slow ones
+HEALTH_CHECK_TIMEOUT = 2
+
+# Shared pool (one worker per check) so checks run concurrently without per-call
+# thread setup; created lazily in each process
+_check_executor: Optional[ThreadPoolExecutor] = None
+
+# Latest submitted run of each check; a check still running is joined, not
+# resubmitted, so a hung dependency holds at most one worker
+_check_futures: Dict[str, Future] = {}
+_check_futures_lock = threading.Lock()
+
+
+def _reset_check_state_after_fork():
+    """
+    Drop the pool and in-flight runs inherited by a forked child.
+    Their threads do not exist in the child, so inherited futures never
+    resolve and the locks may have been held at fork.
+    """
+    global _check_executor, _check_futures, _check_futures_lock
+    global _inflight, _inflight_lock
+    _check_executor = None
+    _check_futures = {}
+    _check_futures_lock = threading.Lock()
+    _inflight = {}
+    _inflight_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_check_state_after_fork)
+
+
+def _run_check(check_func: Callable, service) -> Dict[str, Any]:
+    """
+    Run one health check on a pool thread.
+    Pool threads see no request signals, so stale connections are dropped
+    before the check and this thread's connection is closed after it.
+    """
+    close_old_connections()
+    try:
+        return check_func(service)
+    finally:
+        connection.close()
+
+
+def _submit_check(check_name: str, check_func: Callable, service) -> Future:
+    """Submit a check, or join its run that is still in progress."""
+    global _check_executor
+    with _check_futures_lock:
+        if _check_executor is None:
+            _check_executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix='health-check')
+        future = _check_futures.get(check_name)
+        if future is None or future.done():
+            future = _check_executor.submit(_run_check, check_func, service)
+            _check_futures[check_name] = future
+        return future
+
+# Fraction of pool capacity in use above which the database is reported degraded
+POOL_SATURATION_THRESHOLD = 0.8
+
+
+def get_connection_pool_stats(conn) -> Optional[Dict[str, Any]]:
+    """
+    Get connection pool gauges for a database connection, if it is pooled.
+    
+    Supports SQLAlchemy-style pools (size/checkedout/overflow), as exposed by
+    pooling backends such as django-db-connection-pool. Stock Django backends
+    have no pool and return None.
+    
+    Args:
+        conn: Django database connection wrapper
+        
+    Returns:
+        Pool statistics or None if the backend does not pool connections
+    """
+    pool = getattr(conn, 'pool', None) or getattr(conn, 'connection_pool', None)
+    if pool is None or not callable(getattr(pool, 'checkedout', None)):
+        return None
+    
+    size = pool.size()
+    checked_out = pool.checkedout()
+    max_overflow = max(getattr(pool, '_max_overflow', 0), 0)
+    capacity = size + max_overflow
+    return {
+        'size': size,
+        'checked_out': checked_out,
+        'overflow': pool.overflow(),
+        'max_overflow': max_overflow,
+        'utilization': round(checked_out / capacity, 2) if capacity else 0.0,
+    }
+
+
+# Seconds between full SMTP login checks; probes in between only test reachability
+EMAIL_AUTH_CHECK_INTERVAL = 300
+
+_SMTP_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+_email_auth_checked_at = float('-inf')
+
+
+def _check_email_service():
+    """
+    Verify the email service is reachable.
+    
+    Raises:
+        Exception: If the service cannot be reached
+    """
+    global _email_auth_checked_at
+    now = time.monotonic()
+    
+    if (settings.EMAIL_BACKEND == _SMTP_BACKEND
+            and now - _email_auth_checked_at < EMAIL_AUTH_CHECK_INTERVAL):
+        # Plain TCP connect, no SMTP/STARTTLS handshake
+        sock = socket.create_connection(
+            (settings.EMAIL_HOST, settings.EMAIL_PORT), timeout=2
+        )
+        sock.close()
+        return
+    
+    email_connection = get_connection()
+    email_connection.open()
+    email_connection.close()
+    _email_auth_checked_at = now
+
+
+# Seconds disk usage readings are reused, disk usage changes slowly
+DISK_USAGE_TTL = 30
+
+DiskUsage = namedtuple('DiskUsage', ['total', 'used', 'free', 'percent'])
+
+_disk_usage_cache = TTLCache(DISK_USAGE_TTL)
+
+
+def get_disk_usage(path: str = '/') -> DiskUsage:
+    """
+    Get disk usage for a path, cached for DISK_USAGE_TTL seconds.
+    
+    Args:
+        path: Filesystem path
+        
+    Returns:
+        DiskUsage with byte counts and percentage used
+    """
+    usage = _disk_usage_cache.get(path)
+    if usage is not None:
+        return usage
+    
+    if hasattr(os, 'statvfs'):
+        st = os.statvfs(path)
+        total = st.f_blocks * st.f_frsize
+        used = (st.f_blocks - st.f_bfree) * st.f_frsize
+        free = st.f_bavail * st.f_frsize
+        # Same formula as psutil: share of space available to unprivileged users
+        usable = used + free
+        percent = round(used / usable * 100, 1) if usable else 0.0
+        usage = DiskUsage(total, used, free, percent)
+    else:
+        usage = DiskUsage(*psutil.disk_usage(path))
+    
+    _disk_usage_cache.set(path, usage)
+    return usage
+
+
+# Seconds between background CPU usage samples
+CPU_SAMPLE_INTERVAL = 2
+
+# psutil handle for this worker, reused so per-process reads share state
+_process: Optional[psutil.Process] = None
+
+
+def _get_process() -> psutil.Process:
+    """Get the cached psutil handle for the current process (fork-aware)."""
+    global _process
+    pid = os.getpid()
+    if _process is None or _process.pid != pid:
+        _process = psutil.Process(pid)
+    return _process
+
+
+# Latest CPU usage readings, refreshed by the sampler thread
+_cpu_sample = {'percent': 0.0, 'process_percent': 0.0}
+_cpu_sampler_lock = threading.Lock()
+# Process the sampler runs in; a forked worker inherits the flag, not the thread
+_cpu_sampler_pid = None
+
+# Prime psutil so the first non-blocking reading covers a real interval
+psutil.cpu_percent(interval=None)
+
+
+def _sample_cpu(process: psutil.Process):
+    """Refresh CPU usage readings forever without blocking requests."""
+    while True:
+        time.sleep(CPU_SAMPLE_INTERVAL)
+        try:
+            _cpu_sample['percent'] = psutil.cpu_percent(interval=None)
+            _cpu_sample['process_percent'] = process.cpu_percent(interval=None)
+        except Exception as e:
+            logger.error(f"CPU sampling failed: {str(e)}")
+
+
+def _ensure_cpu_sampler():
+    """Start the background CPU sampler once per process."""
+    global _cpu_sampler_pid
+    pid = os.getpid()
+    if _cpu_sampler_pid == pid:
+        return
+    
+    with _cpu_sampler_lock:
+        if _cpu_sampler_pid == pid:
+            return
+        process = _get_process()
+        _cpu_sample['percent'] = psutil.cpu_percent(interval=None)
+        _cpu_sample['process_percent'] = process.cpu_percent(interval=None)
+        threading.Thread(
+            target=_sample_cpu, args=(process,),
+            name='health-cpu-sampler', daemon=True
+        ).start()
+        _cpu_sampler_pid = pid
+
+
+class HealthCheckService:
+    """
+    Service for performing health checks on various system components.
+    """
     
     def get_health_status(self, detailed: bool = False) -> Dict[str, Any]:
         """
@@ -44,10 +378,46 @@ class HealthCheckService:
         Returns:
             Health status dictionary
         """
-        start_time = timezone.now()
+        cached = _health_status_cache.get(detailed)
+        if cached is not None:
+            return dict(cached)
+        
+        with _inflight_lock:
+            run = _inflight.get(detailed)
+            is_leader = run is None
+            if is_leader:
+                run = _inflight[detailed] = _InflightRun()
+        
+        if not is_leader:
+            # Another request is already running the checks; reuse its result
+            if run.done.wait(timeout=HEALTH_INFLIGHT_WAIT) and run.result is not None:
+                return dict(run.result)
+            return self._run_health_checks(detailed)
+        
+        try:
+            health_status = self._run_health_checks(detailed)
+            run.result = health_status
+        finally:
+            run.done.set()
+            with _inflight_lock:
+                _inflight.pop(detailed, None)
+        
+        return dict(health_status)
+    
+    def _run_health_checks(self, detailed: bool) -> Dict[str, Any]:
+        """
+        Run all health checks and cache the combined status.
+        
+        Args:
+            detailed: Include detailed metrics
+            
+        Returns:
+            Health status dictionary
+        """
+        start_time = time.perf_counter()
         health_status = {
             'status': 'healthy',
-            'timestamp': start_time.isoformat(),
+            'timestamp': timezone.now().isoformat(),
             'version': getattr(settings, 'APP_VERSION', '1.0.0'),
             'environment': getattr(settings, 'ENVIRONMENT', 'unknown'),
             'checks': {}
@@ -56,9 +426,26 @@ class HealthCheckService:
         failed_checks = []
         warning_checks = []
         
-        for check_name, check_func in self.checks.items():
+        # Run the independent checks concurrently under one overall deadline,
+        # collect in declaration order
+        futures = {
+            check_name: _submit_check(check_name, check_func, self)
+            for check_name, check_func in self.CHECKS.items()
+        }
+        done, _ = wait(futures.values(), timeout=HEALTH_CHECK_TIMEOUT)
+        
+        for check_name, future in futures.items():
+            if future not in done:
+                logger.error(f"Health check {check_name} timed out")
+                health_status['checks'][check_name] = {
+                    'status': 'unhealthy',
+                    'error': 'Health check timed out'
+                }
+                failed_checks.append(check_name)
+                continue
+            
             try:
-                check_result = check_func()
+                check_result = future.result()
                 health_status['checks'][check_name] = check_result
                 
                 if check_result['status'] == 'unhealthy':
@@ -83,15 +470,17 @@ class HealthCheckService:
             health_status['warning_checks'] = warning_checks
         
         # Add response time
-        response_time = (timezone.now() - start_time).total_seconds() * 1000
+        response_time = (time.perf_counter() - start_time) * 1000
         health_status['response_time_ms'] = response_time
         
         # Add detailed metrics if requested
         if detailed:
             health_status['metrics'] = self.get_system_metrics()
         
+        _health_status_cache.set(detailed, health_status)
         return health_status
     
+    @ttl_cache(seconds=3)
     def check_database(self) -> Dict[str, Any]:
         """
         Check database connectivity and performance.
@@ -100,7 +489,7 @@ class HealthCheckService:
             Database health status
         """
         try:
-            start_time = timezone.now()
+            start_time = time.perf_counter()
             
             # Test connection
             with connection.cursor() as cursor:
@@ -108,19 +497,26 @@ class HealthCheckService:
                 cursor.fetchone()
             
             # Calculate response time
-            response_time = (timezone.now() - start_time).total_seconds() * 1000
+            response_time = (time.perf_counter() - start_time) * 1000
             
             # Check connection pool
             conn_info = {
                 'vendor': connection.vendor,
                 'is_usable': connection.is_usable(),
-                'response_time_ms': response_time
+                'response_time_ms': response_time,
+                'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
             }
+            pool_stats = get_connection_pool_stats(connection)
+            if pool_stats is not None:
+                conn_info['pool'] = pool_stats
             
-            # Determine status based on response time
+            # Determine status based on response time and pool saturation
             if response_time > 1000:  # More than 1 second
                 status = 'degraded'
                 message = 'Database response time is high'
+            elif pool_stats and pool_stats['utilization'] > POOL_SATURATION_THRESHOLD:
+                status = 'degraded'
+                message = 'Database connection pool is near capacity'
             else:
                 status = 'healthy'
                 message = 'Database is responsive'
@@ -139,6 +535,7 @@ class HealthCheckService:
                 'error': str(e)
             }
     
+    @ttl_cache(seconds=3)
     def check_cache(self) -> Dict[str, Any]:
         """
         Check cache service connectivity and performance.
@@ -147,11 +544,11 @@ class HealthCheckService:
             Cache health status
         """
         try:
-            start_time = timezone.now()
+            start_time = time.perf_counter()
             
             # Test cache operations
             test_key = 'health_check_test'
-            test_value = timezone.now().isoformat()
+            test_value = str(time.perf_counter())
             
             # Set value
             cache.set(test_key, test_value, 10)
@@ -163,7 +560,7 @@ class HealthCheckService:
             cache.delete(test_key)
             
             # Calculate response time
-            response_time = (timezone.now() - start_time).total_seconds() * 1000
+            response_time = (time.perf_counter() - start_time) * 1000
             
             # Verify operations
             if retrieved_value != test_value:
@@ -203,11 +600,11 @@ class HealthCheckService:
             Disk space health status
         """
         try:
-            disk_usage = psutil.disk_usage('/')
+            disk_usage = get_disk_usage('/')
             
             # Calculate percentage used
             percent_used = disk_usage.percent
-            available_gb = disk_usage.free / (1024 ** 3)
+            available_gb = disk_usage.free / _GB
             
             # Determine status
             if percent_used > 90:
@@ -226,7 +623,7 @@ class HealthCheckService:
                 'details': {
                     'percent_used': percent_used,
                     'available_gb': round(available_gb, 2),
-                    'total_gb': round(disk_usage.total / (1024 ** 3), 2)
+                    'total_gb': round(disk_usage.total / _GB, 2)
                 }
             }
             
@@ -250,7 +647,7 @@ class HealthCheckService:
             
             # Calculate percentage used
             percent_used = memory.percent
-            available_gb = memory.available / (1024 ** 3)
+            available_gb = memory.available / _GB
             
             # Determine status
             if percent_used > 90:
@@ -269,7 +666,7 @@ class HealthCheckService:
                 'details': {
                     'percent_used': percent_used,
                     'available_gb': round(available_gb, 2),
-                    'total_gb': round(memory.total / (1024 ** 3), 2)
+                    'total_gb': round(memory.total / _GB, 2)
                 }
             }
             
@@ -281,6 +678,7 @@ class HealthCheckService:
                 'error': str(e)
             }
     
+    @ttl_cache(seconds=60)
     def check_external_services(self) -> Dict[str, Any]:
         """
         Check connectivity to external services.
@@ -294,9 +692,7 @@ class HealthCheckService:
         # Check email service
         if getattr(settings, 'EMAIL_HOST', None):
             try:
-                from django.core.mail import connection as email_connection
-                email_connection.open()
-                email_connection.close()
+                _check_email_service()
                 services_status['email'] = 'healthy'
             except Exception as e:
                 services_status['email'] = 'unhealthy'
@@ -322,22 +718,28 @@ class HealthCheckService:
             System metrics dictionary
         """
         try:
-            # CPU metrics
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # CPU metrics, sampled in the background instead of blocking
+            _ensure_cpu_sampler()
+            cpu_percent = _cpu_sample['percent']
             cpu_count = psutil.cpu_count()
             
             # Memory metrics
             memory = psutil.virtual_memory()
             
             # Disk metrics
-            disk = psutil.disk_usage('/')
+            disk = get_disk_usage('/')
             
             # Network metrics
             network = psutil.net_io_counters()
             
-            # Process metrics
-            process = psutil.Process(os.getpid())
-            process_memory = process.memory_info()
+            # Database connection pool metrics
+            pool_stats = get_connection_pool_stats(connection)
+            
+            # Process metrics, read in one batch from the cached handle
+            process = _get_process()
+            with process.oneshot():
+                process_memory = process.memory_info()
+                num_threads = process.num_threads()
             
             return {
                 'cpu': {
@@ -346,13 +748,13 @@ class HealthCheckService:
                 },
                 'memory': {
                     'percent': memory.percent,
-                    'used_gb': round(memory.used / (1024 ** 3), 2),
-                    'available_gb': round(memory.available / (1024 ** 3), 2)
+                    'used_gb': round(memory.used / _GB, 2),
+                    'available_gb': round(memory.available / _GB, 2)
                 },
                 'disk': {
                     'percent': disk.percent,
-                    'used_gb': round(disk.used / (1024 ** 3), 2),
-                    'free_gb': round(disk.free / (1024 ** 3), 2)
+                    'used_gb': round(disk.used / _GB, 2),
+                    'free_gb': round(disk.free / _GB, 2)
                 },
                 'network': {
                     'bytes_sent': network.bytes_sent,
@@ -361,17 +763,68 @@ class HealthCheckService:
                     'packets_recv': network.packets_recv
                 },
                 'process': {
-                    'memory_mb': round(process_memory.rss / (1024 ** 2), 2),
-                    'cpu_percent': process.cpu_percent(),
-                    'num_threads': process.num_threads()
-                }
+                    'memory_mb': round(process_memory.rss / _MB, 2),
+                    'cpu_percent': _cpu_sample['process_percent'],
+                    'num_threads': num_threads
+                },
+                'database_pool': pool_stats
             }
         except Exception as e:
             logger.error(f"Failed to get system metrics: {str(e)}")
             return {}
+    
+    # Checks run by get_health_status, in report order (unbound; called with self)
+    CHECKS = {
+        'database': check_database,
+        'cache': check_cache,
+        'disk': check_disk_space,
+        'memory': check_memory,
+        'external_services': check_external_services,
+    }
+
+
+# Shared service instance; the service keeps no per-request state
+_health_service = HealthCheckService()
+
+_warmer_lock = threading.Lock()
+# Process the warmer runs in; a forked worker inherits the flag, not the thread
+_warmer_pid = None
+
+
+def _warm_health_cache():
+    """Recompute the basic health status just before each cached result expires."""
+    interval = max(HEALTH_STATUS_TTL - 1, 1)
+    while True:
+        try:
+            _health_service.get_health_status(detailed=False)
+        except Exception as e:
+            logger.error(f"Health cache warm-up failed: {str(e)}")
+        time.sleep(interval)
+
+
+def start_health_cache_warmer(**kwargs):
+    """
+    Start the background health cache warmer once per process.
+    Connected to request_started, so it starts in each process on its first
+    request and never in a gunicorn --preload master, which serves none.
+    """
+    global _warmer_pid
+    pid = os.getpid()
+    if _warmer_pid == pid:
+        return
+    
+    with _warmer_lock:
+        if _warmer_pid == pid:
+            return
+        threading.Thread(
+            target=_warm_health_cache,
+            name='health-cache-warmer', daemon=True
+        ).start()
+        _warmer_pid = pid
 
 
 # Health check views
+@never_cache
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def health_check(request):
@@ -379,8 +832,7 @@ def health_check(request):
     Basic health check endpoint.
     Returns 200 if system is operational.
     """
-    health_service = HealthCheckService()
-    health_status = health_service.get_health_status(detailed=False)
+    health_status = _health_service.get_health_status(detailed=False)
     
     if health_status['status'] == 'unhealthy':
         return Response(health_status, status=status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -390,6 +842,7 @@ def health_check(request):
         return Response(health_status, status=status.HTTP_200_OK)
 
 
+@never_cache
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def health_check_detailed(request):
@@ -397,8 +850,7 @@ def health_check_detailed(request):
     Detailed health check endpoint.
     Returns comprehensive system metrics.
     """
-    health_service = HealthCheckService()
-    health_status = health_service.get_health_status(detailed=True)
+    health_status = _health_service.get_health_status(detailed=True)
     
     if health_status['status'] == 'unhealthy':
         return Response(health_status, status=status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -406,6 +858,22 @@ def health_check_detailed(request):
         return Response(health_status, status=status.HTTP_200_OK)
 
 
+# Static liveness body; the response itself is built per request since
+# middleware may add headers to it
+_HEALTHZ_BODY = b'ok'
+
+
+@never_cache
+def healthz(request):
+    """
+    Minimal liveness endpoint for orchestrators.
+    Touches no database, cache or psutil and skips DRF rendering.
+    Use readiness_probe for dependency checks; health_check is for operators.
+    """
+    return HttpResponse(_HEALTHZ_BODY, content_type='text/plain')
+
+
+@never_cache
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def liveness_probe(request):
@@ -419,6 +887,7 @@ def liveness_probe(request):
     }, status=status.HTTP_200_OK)
 
 
+@never_cache
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def readiness_probe(request):
@@ -426,12 +895,10 @@ def readiness_probe(request):
     Kubernetes readiness probe endpoint.
     Returns 200 if application is ready to serve traffic.
     """
-    health_service = HealthCheckService()
-    
     # Quick checks for readiness
     try:
         # Check database
-        db_check = health_service.check_database()
+        db_check = _health_service.check_database()
         if db_check['status'] == 'unhealthy':
             return Response({
                 'status': 'not_ready',
@@ -439,7 +906,7 @@ def readiness_probe(request):
             }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         
         # Check cache
-        cache_check = health_service.check_cache()
+        cache_check = _health_service.check_cache()
         if cache_check['status'] == 'unhealthy':
             return Response({
                 'status': 'not_ready',
@@ -459,86 +926,228 @@ def readiness_probe(request):
         }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
 
+# Maximum distinct endpoints tracked before new ones are grouped as "other"
+MAX_ENDPOINTS = 1000
+
+# Native Prometheus instruments, fed alongside the in-process metrics when available;
+# MetricsCollector.get_metrics always reads the in-process side
+if prometheus_client is not None:
+    HTTP_REQUESTS = prometheus_client.Counter(
+        'http_requests_total', 'Total HTTP requests',
+        ['method', 'endpoint', 'status']
+    )
+    HTTP_LATENCY = prometheus_client.Histogram(
+        'http_request_duration_seconds', 'HTTP request latency in seconds',
+        ['method', 'endpoint'],
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    )
+    ERRORS = prometheus_client.Counter(
+        'errors_total', 'Recorded application errors', ['type']
+    )
+    BUSINESS_METRICS = prometheus_client.Gauge(
+        'business_metric', 'Latest value of a business metric', ['name']
+    )
+else:
+    HTTP_REQUESTS = HTTP_LATENCY = ERRORS = BUSINESS_METRICS = None
+
+
+def _new_request_entry() -> Dict[str, Any]:
+    """Create an empty per-endpoint request metrics entry."""
+    return {'lock': threading.Lock(), 'count': 0, 'total_time': 0.0, 'status_codes': Counter()}
+
+
+def _new_error_entry() -> Dict[str, Any]:
+    """Create an empty per-type error metrics entry."""
+    # Keep only last 100 error messages
+    return {'lock': threading.Lock(), 'count': 0, 'messages': deque(maxlen=100)}
+
+
+def _new_business_entry() -> Dict[str, Any]:
+    """Create an empty per-name business metrics entry."""
+    # Keep only last 1000 values
+    return {'lock': threading.Lock(), 'values': deque(maxlen=1000)}
+
+
 class MetricsCollector:
     """
     Collects and aggregates system metrics.
+    Safe to use from concurrent request threads: each key has its own lock
+    and readers get a snapshot.
     """
     
     def __init__(self):
-        self.metrics = {
-            'requests': {},
-            'errors': {},
+        self._lock = threading.Lock()
+        self._endpoints = set()
+        self.metrics = self._empty_metrics()
+    
+    @staticmethod
+    def _empty_metrics() -> Dict[str, Any]:
+        """Create empty metric tables."""
+        return {
+            'requests': defaultdict(_new_request_entry),
+            'errors': defaultdict(_new_error_entry),
             'performance': {},
-            'business': {}
+            'business': defaultdict(_new_business_entry)
         }
     
+    def _get_entry(self, table: defaultdict, key: str) -> Dict[str, Any]:
+        """Get the entry for a key, creating it at most once."""
+        entry = table.get(key)
+        if entry is None:
+            with self._lock:
+                entry = table[key]
+        return entry
+    
+    def _bound_endpoint(self, path: str) -> str:
+        """Map a path to itself, or to "other" once MAX_ENDPOINTS are tracked."""
+        if path in self._endpoints:
+            return path
+        with self._lock:
+            if len(self._endpoints) >= MAX_ENDPOINTS:
+                return 'other'
+            self._endpoints.add(path)
+        return path
+    
     def record_request(self, method: str, path: str, status_code: int, 
                       duration_ms: float):
-        """Record API request metrics."""
-        key = f"{method}:{path}"
-        
-        if key not in self.metrics['requests']:
-            self.metrics['requests'][key] = {
-                'count': 0,
-                'total_time': 0,
-                'status_codes': {}
-            }
+        """
+        Record API request metrics.
         
-        self.metrics['requests'][key]['count'] += 1
-        self.metrics['requests'][key]['total_time'] += duration_ms
+        Args:
+            method: HTTP method
+            path: Route template (not the raw path) to keep cardinality bounded
+            status_code: Response status code
+            duration_ms: Request duration in milliseconds
+        """
+        path = self._bound_endpoint(path)
+        if HTTP_REQUESTS is not None:
+            HTTP_REQUESTS.labels(method, path, str(status_code)).inc()
+            HTTP_LATENCY.labels(method, path).observe(duration_ms / 1000)
         
-        status_key = str(status_code)
-        if status_key not in self.metrics['requests'][key]['status_codes']:
-            self.metrics['requests'][key]['status_codes'][status_key] = 0
-        self.metrics['requests'][key]['status_codes'][status_key] += 1
+        entry = self._get_entry(self.metrics['requests'], f"{method}:{path}")
+        with entry['lock']:
+            entry['count'] += 1
+            entry['total_time'] += duration_ms
+            entry['status_codes'][str(status_code)] += 1
     
     def record_error(self, error_type: str, error_message: str):
         """Record error metrics."""
-        if error_type not in self.metrics['errors']:
-            self.metrics['errors'][error_type] = {
-                'count': 0,
-                'messages': []
-            }
+        if ERRORS is not None:
+            ERRORS.labels(error_type).inc()
         
-        self.metrics['errors'][error_type]['count'] += 1
-        self.metrics['errors'][error_type]['messages'].append({
+        entry = self._get_entry(self.metrics['errors'], error_type)
+        message = {
             'message': error_message,
             'timestamp': timezone.now().isoformat()
-        })
+        }
         
-        # Keep only last 100 error messages
-        if len(self.metrics['errors'][error_type]['messages']) > 100:
-            self.metrics['errors'][error_type]['messages'] = \
-                self.metrics['errors'][error_type]['messages'][-100:]
+        with entry['lock']:
+            entry['count'] += 1
+            entry['messages'].append(message)
     
     def record_business_metric(self, metric_name: str, value: Any):
         """Record business metrics."""
-        if metric_name not in self.metrics['business']:
-            self.metrics['business'][metric_name] = []
+        if BUSINESS_METRICS is not None and isinstance(value, (int, float)):
+            BUSINESS_METRICS.labels(metric_name).set(value)
         
-        self.metrics['business'][metric_name].append({
+        entry = self._get_entry(self.metrics['business'], metric_name)
+        sample = {
             'value': value,
             'timestamp': timezone.now().isoformat()
-        })
+        }
         
-        # Keep only last 1000 values
-        if len(self.metrics['business'][metric_name]) > 1000:
-            self.metrics['business'][metric_name] = \
-                self.metrics['business'][metric_name][-1000:]
+        with entry['lock']:
+            entry['values'].append(sample)
     
     def get_metrics(self) -> Dict[str, Any]:
-        """Get all collected metrics."""
-        return self.metrics
+        """
+        Get a consistent snapshot of all collected metrics.
+        
+        Returns:
+            Metrics dictionary safe to iterate while recording continues
+        """
+        with self._lock:
+            requests = list(self.metrics['requests'].items())
+            errors = list(self.metrics['errors'].items())
+            business = list(self.metrics['business'].items())
+            performance = dict(self.metrics['performance'])
+        
+        snapshot = {
+            'requests': {},
+            'errors': {},
+            'performance': performance,
+            'business': {}
+        }
+        
+        for key, entry in requests:
+            with entry['lock']:
+                snapshot['requests'][key] = {
+                    'count': entry['count'],
+                    'total_time': entry['total_time'],
+                    'status_codes': dict(entry['status_codes'])
+                }
+        
+        for key, entry in errors:
+            with entry['lock']:
+                snapshot['errors'][key] = {
+                    'count': entry['count'],
+                    'messages': list(entry['messages'])
+                }
+        
+        for key, entry in business:
+            with entry['lock']:
+                snapshot['business'][key] = list(entry['values'])
+        
+        return snapshot
     
     def reset_metrics(self):
-        """Reset all metrics."""
-        self.__init__()
+        """Reset all metrics, including the Prometheus instruments' label sets."""
+        with self._lock:
+            self._endpoints = set()
+            self.metrics = self._empty_metrics()
+        
+        if prometheus_client is not None:
+            for instrument in (HTTP_REQUESTS, HTTP_LATENCY, ERRORS, BUSINESS_METRICS):
+                instrument.clear()
 
 
 # Global metrics collector
 metrics_collector = MetricsCollector()
 
 
+def _prometheus_text(metrics: Dict[str, Any]) -> str:
+    """
+    Render collected metrics in Prometheus text exposition format.
+    
+    Args:
+        metrics: Snapshot from MetricsCollector.get_metrics
+        
+    Returns:
+        Newline-terminated metric lines as one string
+    """
+    requests = [
+        (endpoint, data['count'],
+         data['total_time'] / data['count'] if data['count'] > 0 else 0)
+        for endpoint, data in metrics['requests'].items()
+    ]
+    
+    lines = chain(
+        # Request metrics
+        ('http_requests_total{endpoint="%s"} %d\n' % (endpoint, count)
+         for endpoint, count, _ in requests),
+        ('http_request_duration_ms{endpoint="%s"} %s\n' % (endpoint, avg_time)
+         for endpoint, _, avg_time in requests),
+        # Error metrics
+        ('errors_total{type="%s"} %d\n' % (error_type, data['count'])
+         for error_type, data in metrics['errors'].items()),
+        # Business metrics
+        ('business_metric{name="%s"} %s\n' % (metric_name, values[-1]['value'])
+         for metric_name, values in metrics['business'].items() if values),
+    )
+    return ''.join(lines)
+
+
+@never_cache
 @api_view(['GET'])
 @permission_classes([AllowAny])  # Should be restricted in production
 def metrics_endpoint(request):
@@ -546,34 +1155,15 @@ def metrics_endpoint(request):
     Metrics endpoint for monitoring systems.
     Returns Prometheus-compatible metrics.
     """
-    metrics = metrics_collector.get_metrics()
-    
-    # Format metrics for Prometheus
-    prometheus_metrics = []
-    
-    # Request metrics
-    for endpoint, data in metrics['requests'].items():
-        avg_time = data['total_time'] / data['count'] if data['count'] > 0 else 0
-        prometheus_metrics.append(
-            f'http_requests_total{{endpoint="{endpoint}"}} {data["count"]}'
-        )
-        prometheus_metrics.append(
-            f'http_request_duration_ms{{endpoint="{endpoint}"}} {avg_time}'
+    if prometheus_client is not None:
+        return HttpResponse(
+            prometheus_client.generate_latest(),
+            content_type=prometheus_client.CONTENT_TYPE_LATEST
         )
     
-    # Error metrics
-    for error_type, data in metrics['errors'].items():
-        prometheus_metrics.append(
-            f'errors_total{{type="{error_type}"}} {data["count"]}'
-        )
-    
-    # Business metrics
-    for metric_name, values in metrics['business'].items():
-        if values:
-            latest_value = values[-1]['value']
-            prometheus_metrics.append(
-                f'business_metric{{name="{metric_name}"}} {latest_value}'
-            )
+    metrics = metrics_collector.get_metrics()
     
-    return Response('\n'.join(prometheus_metrics), 
-                   content_type='text/plain; version=0.0.4')
+    return HttpResponse(
+        _prometheus_text(metrics),
+        content_type='text/plain; version=0.0.4'
+    )
@@ -4,12 +4,32 @@ Provides structured logging with multiple handlers and formatters.
 """
 
 import os
+import atexit
+import functools
 import logging
 import logging.config
-from datetime import datetime
-from typing import Dict, Any
+import queue
+import threading
+import time
+import weakref
+from contextvars import ContextVar
+from logging.handlers import (
+    MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
+)
+from typing import Dict, Any, Optional
 import json
-from pythonjsonlogger import jsonlogger
+
+try:
+    from pythonjsonlogger.orjson import OrjsonFormatter as BaseJsonFormatter
+except ImportError:
+    from pythonjsonlogger.jsonlogger import JsonFormatter as BaseJsonFormatter
+
+
+# Request context read by the logging filters, set by core.middleware.
+# Context variables follow the request across threads and async tasks.
+REQUEST_ID: ContextVar[str] = ContextVar('request_id', default='NO_REQUEST_ID')
+USER_ID: ContextVar[Optional[int]] = ContextVar('user_id', default=None)
+USER_ROLE: ContextVar[Optional[str]] = ContextVar('user_role', default=None)
 
 
 class RequestIdFilter(logging.Filter):
@@ -18,10 +38,7 @@ class RequestIdFilter(logging.Filter):
     """
     
     def filter(self, record):
-        # Try to get request ID from thread local storage
-        import threading
-        local = threading.local()
-        record.request_id = getattr(local, 'request_id', 'NO_REQUEST_ID')
+        record.request_id = REQUEST_ID.get()
         return True
 
 
@@ -31,36 +48,57 @@ class UserContextFilter(logging.Filter):
     """
     
     def filter(self, record):
-        import threading
-        local = threading.local()
-        record.user_id = getattr(local, 'user_id', None)
-        record.user_role = getattr(local, 'user_role', None)
+        record.user_id = USER_ID.get()
+        record.user_role = USER_ROLE.get()
         return True
 
 
+# Path prefixes of the health endpoints whose request logs are dropped
+HEALTH_CHECK_PATH_PREFIXES = ('/healthz', '/api/health/')
+
+
 class HealthCheckFilter(logging.Filter):
     """
     Filter to exclude health check logs.
     """
     
     def filter(self, record):
-        # Skip health check endpoint logs to reduce noise
-        message = record.getMessage()
-        return '/health/' not in message and '/api/health' not in message
+        # Errors on the health endpoints must still be logged
+        if record.levelno >= logging.ERROR:
+            return True
+        # Skip health check request logs to reduce noise, matched on the path extra
+        path = getattr(record, 'path', None)
+        return not (isinstance(path, str) and path.startswith(HEALTH_CHECK_PATH_PREFIXES))
+
+
+# Attributes every LogRecord carries; only caller-supplied extras are copied
+_LOGRECORD_STANDARD_ATTRS = frozenset(
+    logging.LogRecord('', 0, '', 0, '', None, None).__dict__
+) | {'message', 'asctime'}
 
 
-class CustomJsonFormatter(jsonlogger.JsonFormatter):
+# Source location and thread identity, only serialized for ERROR and above
+_ERROR_CONTEXT_ATTRS = (
+    'pathname', 'lineno', 'funcName', 'processName', 'thread', 'threadName'
+)
+
+
+class CustomJsonFormatter(BaseJsonFormatter):
     """
     Custom JSON formatter for structured logging.
+    Serializes with orjson when available.
     """
     
     def add_fields(self, log_record, record, message_dict):
         super().add_fields(log_record, record, message_dict)
         
         # Add custom fields
-        log_record['timestamp'] = datetime.utcnow().isoformat()
+        # Epoch seconds (UTC) captured when the record was created
+        log_record['timestamp'] = record.created
         log_record['level'] = record.levelname
         log_record['logger'] = record.name
+        # Worker pid, so lines of pre-forked workers can be told apart
+        log_record['process'] = record.process
         
         # Add request context if available
         if hasattr(record, 'request_id'):
@@ -72,16 +110,186 @@ class CustomJsonFormatter(jsonlogger.JsonFormatter):
         if hasattr(record, 'user_role'):
             log_record['user_role'] = record.user_role
         
+        # Add source location for errors
+        if record.levelno >= logging.ERROR:
+            for key in _ERROR_CONTEXT_ATTRS:
+                log_record[key] = getattr(record, key)
+        
         # Add exception info if present
         if record.exc_info:
             log_record['exception'] = self.formatException(record.exc_info)
         
         # Add extra fields
         for key, value in record.__dict__.items():
-            if key not in log_record and not key.startswith('_'):
+            if (key not in _LOGRECORD_STANDARD_ATTRS and key not in log_record
+                    and not key.startswith('_')):
                 log_record[key] = value
 
 
+class FastRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that only stats the log file when a rollover is due.
+    Backport of the CPython 3.12 shouldRollover ordering.
+    """
+    
+    def shouldRollover(self, record):
+        if self.stream is None:  # delay was set
+            self.stream = self._open()
+        if self.maxBytes > 0:
+            pos = self.stream.tell()
+            if not pos:
+                # Never rollover an empty file
+                return False
+            msg = "%s\n" % self.format(record)
+            if pos + len(msg) >= self.maxBytes:
+                # Never rollover anything other than regular files
+                if os.path.exists(self.baseFilename) and not os.path.isfile(self.baseFilename):
+                    return False
+                return True
+        return False
+
+
+# Seconds between forced flushes of buffered file log records
+LOG_FLUSH_INTERVAL = 30
+
+# Buffered file handlers, flushed together by one thread per process
+_flush_handlers = weakref.WeakSet()
+_flusher_lock = threading.Lock()
+_flusher_pid = None
+
+
+def _flush_periodically():
+    """Flush every buffered file handler each LOG_FLUSH_INTERVAL seconds."""
+    while True:
+        time.sleep(LOG_FLUSH_INTERVAL)
+        for handler in list(_flush_handlers):
+            handler.flush()
+
+
+def _ensure_flusher():
+    """Start the shared flush thread once per process (fork-aware)."""
+    global _flusher_pid
+    pid = os.getpid()
+    if _flusher_pid == pid:
+        return
+    with _flusher_lock:
+        if _flusher_pid != pid:
+            threading.Thread(
+                target=_flush_periodically, name='log-flusher', daemon=True
+            ).start()
+            _flusher_pid = pid
+
+
+def _reset_flusher_lock():
+    global _flusher_lock
+    _flusher_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    # The lock may have been held by another thread at fork time
+    os.register_at_fork(after_in_child=_reset_flusher_lock)
+
+
+class QueuedRotatingFileHandler(logging.Handler):
+    """
+    Rotating file handler that writes from a background thread.
+    Logging threads only format and enqueue records; a QueueListener
+    drains the queue into a MemoryHandler that hands records to the
+    rotating file in batches of `capacity`, at once for records at
+    `flushLevel` (ERROR by default, never higher) or every
+    LOG_FLUSH_INTERVAL seconds, and at exit.
+    
+    The writer thread is started by the first record each process emits,
+    so pre-forked workers (uWSGI, gunicorn --preload) get their own.
+    """
+    
+    def __init__(self, filename: str, maxBytes: int = 0, backupCount: int = 0,
+                 encoding: Optional[str] = None, delay: bool = False,
+                 capacity: int = 512, flushLevel: Any = logging.ERROR):
+        if isinstance(flushLevel, str):
+            flushLevel = logging.getLevelName(flushLevel)
+        # Errors must reach the file even if the process dies right after
+        flushLevel = min(flushLevel, logging.ERROR)
+        
+        self._enqueue = QueueHandler(None)
+        self.target = FastRotatingFileHandler(
+            filename, maxBytes=maxBytes, backupCount=backupCount,
+            encoding=encoding, delay=delay
+        )
+        self.buffer = MemoryHandler(capacity, flushLevel=flushLevel, target=self.target)
+        # Register after the inner handlers so logging.shutdown(), which closes
+        # handlers newest first, drains this one while they are still open
+        super().__init__()
+        self.listener = None
+        # Process the writer thread runs in; threads do not survive fork
+        self._pid = None
+        atexit.register(self._stop_listener)
+    
+    def _start_listener(self):
+        """Start the writer thread for the current process."""
+        if self._pid is not None:
+            # Forked child: the parent still owns its unflushed records
+            self.buffer.acquire()
+            try:
+                self.buffer.buffer.clear()
+            finally:
+                self.buffer.release()
+        self._enqueue.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self._enqueue.queue, self.buffer)
+        self.listener.start()
+        self._pid = os.getpid()
+        _flush_handlers.add(self)
+        _ensure_flusher()
+    
+    def setFormatter(self, fmt):
+        # Records are formatted before they are enqueued
+        super().setFormatter(fmt)
+        self._enqueue.setFormatter(fmt)
+    
+    def emit(self, record):
+        # Called with the handler lock held, which logging resets after fork
+        if self._pid != os.getpid():
+            self._start_listener()
+        self._enqueue.emit(record)
+    
+    def _stop_listener(self):
+        """Drain pending records to disk and stop the writer thread (idempotent)."""
+        if self._pid == os.getpid():
+            self._pid = None
+            self.listener.stop()
+        self.buffer.flush()
+    
+    def flush(self):
+        self.buffer.flush()
+    
+    def close(self):
+        _flush_handlers.discard(self)
+        self._stop_listener()
+        self.buffer.close()
+        self.target.close()
+        super().close()
+
+
+def _ensure_log_dir(log_file_path: str) -> str:
+    """
+    Create the log directory if needed.
+    
+    Args:
+        log_file_path: Configured log file path
+        
+    Returns:
+        Usable log file path
+    """
+    log_dir = os.path.dirname(log_file_path)
+    if log_dir:
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+        except OSError:
+            # Fall back to current directory if can't create log dir
+            return 'app.log'
+    return log_file_path
+
+
 def setup_logging_config() -> Dict[str, Any]:
     """
     Setup comprehensive logging configuration.
@@ -93,16 +301,9 @@ def setup_logging_config() -> Dict[str, Any]:
     
     # Get log level from settings
     log_level = getattr(settings, 'LOG_LEVEL', 'INFO')
-    log_file_path = getattr(settings, 'LOG_FILE_PATH', '/var/log/hospital_management/app.log')
-    
-    # Ensure log directory exists
-    log_dir = os.path.dirname(log_file_path)
-    if log_dir and not os.path.exists(log_dir):
-        try:
-            os.makedirs(log_dir)
-        except:
-            # Fall back to current directory if can't create log dir
-            log_file_path = 'app.log'
+    log_file_path = _ensure_log_dir(
+        getattr(settings, 'LOG_FILE_PATH', '/var/log/hospital_management/app.log')
+    )
     
     config = {
         'version': 1,
@@ -156,44 +357,51 @@ def setup_logging_config() -> Dict[str, Any]:
             },
             'file': {
                 'level': 'INFO',
-                'class': 'logging.handlers.RotatingFileHandler',
+                '()': QueuedRotatingFileHandler,
                 'filename': log_file_path,
                 'maxBytes': 1024 * 1024 * 50,  # 50MB
                 'backupCount': 5,
+                'delay': True,
                 'formatter': 'json',
                 'filters': ['request_id', 'user_context'],
             },
             'error_file': {
                 'level': 'ERROR',
-                'class': 'logging.handlers.RotatingFileHandler',
+                '()': QueuedRotatingFileHandler,
                 'filename': log_file_path.replace('.log', '_error.log'),
                 'maxBytes': 1024 * 1024 * 50,  # 50MB
                 'backupCount': 5,
+                'delay': True,
                 'formatter': 'detailed',
                 'filters': ['request_id', 'user_context'],
             },
             'security_file': {
                 'level': 'WARNING',
-                'class': 'logging.handlers.RotatingFileHandler',
+                '()': QueuedRotatingFileHandler,
                 'filename': log_file_path.replace('.log', '_security.log'),
                 'maxBytes': 1024 * 1024 * 20,  # 20MB
                 'backupCount': 10,
+                'delay': True,
+                'flushLevel': 'WARNING',
                 'formatter': 'json',
             },
             'performance_file': {
                 'level': 'INFO',
-                'class': 'logging.handlers.RotatingFileHandler',
+                '()': QueuedRotatingFileHandler,
                 'filename': log_file_path.replace('.log', '_performance.log'),
                 'maxBytes': 1024 * 1024 * 50,  # 50MB
                 'backupCount': 3,
+                'delay': True,
                 'formatter': 'json',
             },
             'audit_file': {
                 'level': 'INFO',
-                'class': 'logging.handlers.RotatingFileHandler',
+                '()': QueuedRotatingFileHandler,
                 'filename': log_file_path.replace('.log', '_audit.log'),
                 'maxBytes': 1024 * 1024 * 100,  # 100MB
                 'backupCount': 30,  # Keep 30 days of audit logs
+                'delay': True,
+                'flushLevel': 'WARNING',
                 'formatter': 'json',
             },
             'mail_admins': {
@@ -290,14 +498,16 @@ class LoggerMixin:
     Mixin to add logger to classes.
     """
     
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _class_logger(cls):
+        """Get the logger shared by all instances of a class."""
+        return logging.getLogger(f"{cls.__module__}.{cls.__name__}")
+    
     @property
     def logger(self):
         """Get logger for class."""
-        if not hasattr(self, '_logger'):
-            self._logger = logging.getLogger(
-                f"{self.__class__.__module__}.{self.__class__.__name__}"
-            )
-        return self._logger
+        return type(self)._class_logger()
 
 
 class AuditLogger:
@@ -323,7 +533,6 @@ class AuditLogger:
                 'action': action,
                 'user_id': user_id,
                 'details': details,
-                'timestamp': datetime.utcnow().isoformat()
             }
         )
     
@@ -2,13 +2,17 @@
 Custom middleware for cross-cutting concerns.
 """
 
+import os
 import time
 import json
 import logging
-import uuid
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.utils.deprecation import MiddlewareMixin
-from django.http import JsonResponse
+from django.http import HttpResponse
 from django.db import connection
+from django.urls import NoReverseMatch, get_script_prefix, resolve, reverse
 from rest_framework import status
 from .exceptions import (
     BusinessLogicException,
@@ -16,39 +20,104 @@ from .exceptions import (
     AuthorizationException,
     ResourceNotFoundException,
     ConcurrencyException,
-    ExternalServiceException
+    ExternalServiceException,
+    _fast_json_response,
 )
+from .logging_config import REQUEST_ID, USER_ID, USER_ROLE
+from .health_checks import metrics_collector
+
+
+# URL names of the Kubernetes probes served without going through URL resolution
+HEALTH_FAST_PATH_NAMES = (
+    'healthz',
+    'health:liveness-probe',
+    'health:readiness-probe',
+)
+
+
+def _build_health_fast_paths() -> dict:
+    """
+    Map the probe paths of the active URLconf to their views.
+    Paths are relative to the script prefix, matching request.path_info.
+    """
+    fast_paths = {}
+    prefix = get_script_prefix()
+    for name in HEALTH_FAST_PATH_NAMES:
+        try:
+            path = '/' + reverse(name)[len(prefix):]
+        except NoReverseMatch:
+            continue
+        fast_paths[path] = resolve(path).func
+    return fast_paths
+
+
+def _reset_context_var(var, token):
+    """Restore a logging context variable set earlier in the request."""
+    try:
+        var.reset(token)
+    except ValueError:
+        # Set in a copied context (async handling), which is discarded anyway
+        pass
+
+
+def get_client_ip(meta):
+    """Get client IP address from request.META (first X-Forwarded-For hop)."""
+    x_forwarded_for = meta.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return x_forwarded_for.partition(',')[0].strip()
+    return meta.get('REMOTE_ADDR')
+
+
+class HealthCheckFastPathMiddleware(MiddlewareMixin):
+    """Middleware dispatching probe endpoints before URL resolution."""
+    
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        # Only routes that really exist, at the paths they are mounted on
+        self.fast_paths = _build_health_fast_paths()
+    
+    def process_request(self, request):
+        """Serve probe requests directly from the fast-path table."""
+        view = self.fast_paths.get(request.path_info)
+        if view is None:
+            return None
+        
+        response = view(request)
+        # The handler only renders responses returned by resolved views
+        if hasattr(response, 'render') and callable(response.render):
+            response = response.render()
+        return response
 
 
 class RequestLoggingMiddleware(MiddlewareMixin):
     """Middleware for logging HTTP requests and responses."""
     
-    def __init__(self, get_response):
-        self.get_response = get_response
-        self.logger = logging.getLogger('core.middleware')
+    logger = logging.getLogger('core.middleware')
     
     def process_request(self, request):
         """Log incoming request."""
-        request.id = str(uuid.uuid4())
+        request.id = os.urandom(16).hex()
         request.start_time = time.time()
+        request._request_id_token = REQUEST_ID.set(request.id)
         
         # Log request details
-        self.logger.info(
-            f"Request started",
-            extra={
-                'request_id': request.id,
-                'method': request.method,
-                'path': request.path,
-                'user': str(request.user) if request.user.is_authenticated else 'Anonymous',
-                'ip': self.get_client_ip(request),
-            }
-        )
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                f"Request started",
+                extra={
+                    'request_id': request.id,
+                    'method': request.method,
+                    'path': request.path,
+                    'user': str(request.user) if request.user.is_authenticated else 'Anonymous',
+                    'ip': get_client_ip(request.META),
+                }
+            )
         
         return None
     
     def process_response(self, request, response):
         """Log response details."""
-        if hasattr(request, 'start_time'):
+        if hasattr(request, 'start_time') and self.logger.isEnabledFor(logging.INFO):
             duration = time.time() - request.start_time
             
             self.logger.info(
@@ -65,94 +134,63 @@ class RequestLoggingMiddleware(MiddlewareMixin):
         if hasattr(request, 'id'):
             response['X-Request-ID'] = request.id
         
+        if hasattr(request, '_request_id_token'):
+            _reset_context_var(REQUEST_ID, request._request_id_token)
         return response
-    
-    def get_client_ip(self, request):
-        """Get client IP address."""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
 
 
 class ExceptionHandlingMiddleware(MiddlewareMixin):
     """Middleware for centralized exception handling."""
     
-    def __init__(self, get_response):
-        self.get_response = get_response
-        self.logger = logging.getLogger('core.exceptions')
+    logger = logging.getLogger('core.exceptions')
+    
+    # Exception class -> (error label, HTTP status)
+    _EXC_MAP = {
+        ValidationException: ('Validation Error', status.HTTP_400_BAD_REQUEST),
+        AuthorizationException: ('Authorization Error', status.HTTP_403_FORBIDDEN),
+        ResourceNotFoundException: ('Resource Not Found', status.HTTP_404_NOT_FOUND),
+        BusinessLogicException: ('Business Logic Error', status.HTTP_422_UNPROCESSABLE_ENTITY),
+        ConcurrencyException: ('Concurrency Error', status.HTTP_409_CONFLICT),
+        ExternalServiceException: ('External Service Error', status.HTTP_503_SERVICE_UNAVAILABLE),
+    }
     
     def process_exception(self, request, exception):
         """Handle exceptions and return appropriate responses."""
         request_id = getattr(request, 'id', 'unknown')
         
         # Log the exception
-        self.logger.error(
-            f"Exception occurred",
-            extra={
-                'request_id': request_id,
-                'exception_type': type(exception).__name__,
-                'exception_message': str(exception),
-                'path': request.path,
-                'method': request.method,
-                'user': str(request.user) if request.user.is_authenticated else 'Anonymous',
-            },
-            exc_info=True
-        )
-        
-        # Map custom exceptions to HTTP responses
-        if isinstance(exception, ValidationException):
-            return JsonResponse({
-                'error': 'Validation Error',
-                'message': str(exception),
-                'request_id': request_id,
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        elif isinstance(exception, AuthorizationException):
-            return JsonResponse({
-                'error': 'Authorization Error',
-                'message': str(exception),
-                'request_id': request_id,
-            }, status=status.HTTP_403_FORBIDDEN)
-        
-        elif isinstance(exception, ResourceNotFoundException):
-            return JsonResponse({
-                'error': 'Resource Not Found',
-                'message': str(exception),
-                'request_id': request_id,
-            }, status=status.HTTP_404_NOT_FOUND)
-        
-        elif isinstance(exception, BusinessLogicException):
-            return JsonResponse({
-                'error': 'Business Logic Error',
-                'message': str(exception),
-                'request_id': request_id,
-            }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
-        
-        elif isinstance(exception, ConcurrencyException):
-            return JsonResponse({
-                'error': 'Concurrency Error',
-                'message': str(exception),
-                'request_id': request_id,
-            }, status=status.HTTP_409_CONFLICT)
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger.error(
+                f"Exception occurred",
+                extra={
+                    'request_id': request_id,
+                    'exception_type': type(exception).__name__,
+                    'exception_message': str(exception),
+                    'path': request.path,
+                    'method': request.method,
+                    'user': str(request.user) if request.user.is_authenticated else 'Anonymous',
+                },
+                exc_info=True
+            )
         
-        elif isinstance(exception, ExternalServiceException):
-            return JsonResponse({
-                'error': 'External Service Error',
-                'message': str(exception),
-                'request_id': request_id,
-            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        # Map custom exceptions to HTTP responses, most specific class first
+        for exc_class in type(exception).__mro__:
+            mapped = self._EXC_MAP.get(exc_class)
+            if mapped is not None:
+                error, status_code = mapped
+                return _fast_json_response({
+                    'error': error,
+                    'message': str(exception),
+                    'request_id': request_id,
+                }, status_code)
         
         # For other exceptions, return generic error in production
-        from django.conf import settings
         if not settings.DEBUG:
-            return JsonResponse({
+            return _fast_json_response({
                 'error': 'Internal Server Error',
                 'message': 'An unexpected error occurred',
                 'request_id': request_id,
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            }, status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         # In debug mode, let Django handle the exception
         return None
@@ -161,27 +199,32 @@ class ExceptionHandlingMiddleware(MiddlewareMixin):
 class PerformanceMonitoringMiddleware(MiddlewareMixin):
     """Middleware for monitoring application performance."""
     
-    def __init__(self, get_response):
-        self.get_response = get_response
-        self.logger = logging.getLogger('core.performance')
+    logger = logging.getLogger('core.performance')
     
-    def process_request(self, request):
-        """Start performance monitoring."""
-        request._db_queries_start = len(connection.queries)
-        return None
+    # The query counter wraps the synchronous view call
+    async_capable = False
+    
+    def __call__(self, request):
+        """Count database queries executed while handling the request."""
+        request._db_query_count = 0
+        
+        def count_queries(execute, sql, params, many, context):
+            request._db_query_count += 1
+            return execute(sql, params, many, context)
+        
+        with connection.execute_wrapper(count_queries):
+            return super().__call__(request)
     
     def process_response(self, request, response):
         """Log performance metrics."""
         if hasattr(request, 'start_time'):
             duration = time.time() - request.start_time
             
-            # Count database queries
-            db_queries = 0
-            if hasattr(request, '_db_queries_start'):
-                db_queries = len(connection.queries) - request._db_queries_start
+            db_queries = getattr(request, '_db_query_count', 0)
             
             # Log if request is slow
-            if duration > 1.0:  # Log requests taking more than 1 second
+            # Log requests taking more than 1 second
+            if duration > 1.0 and self.logger.isEnabledFor(logging.WARNING):
                 self.logger.warning(
                     f"Slow request detected",
                     extra={
@@ -193,6 +236,13 @@ class PerformanceMonitoringMiddleware(MiddlewareMixin):
                     }
                 )
             
+            # Record request metrics keyed by route template, not raw path
+            resolver_match = getattr(request, 'resolver_match', None)
+            endpoint = resolver_match.route if resolver_match else 'unmatched'
+            metrics_collector.record_request(
+                request.method, endpoint, response.status_code, duration * 1000
+            )
+            
             # Add performance headers
             response['X-Response-Time'] = f"{duration:.3f}"
             response['X-DB-Queries'] = str(db_queries)
@@ -200,23 +250,27 @@ class PerformanceMonitoringMiddleware(MiddlewareMixin):
         return response
 
 
+# Headers added to every response by SecurityHeadersMiddleware
+_SECURITY_HEADERS = {
+    'Content-Security-Policy': "default-src 'self'; script-src 'self' 'unsafe-inline';",
+    'X-Content-Type-Options': 'nosniff',
+    'X-Frame-Options': 'DENY',
+    'X-XSS-Protection': '1; mode=block',
+    'Referrer-Policy': 'strict-origin-when-cross-origin',
+}
+
+
 class SecurityHeadersMiddleware(MiddlewareMixin):
     """Middleware to add security headers to responses."""
     
     def process_response(self, request, response):
         """Add security headers."""
-        # Content Security Policy
-        response['Content-Security-Policy'] = "default-src 'self'; script-src 'self' 'unsafe-inline';"
-        
-        # Additional security headers
-        response['X-Content-Type-Options'] = 'nosniff'
-        response['X-Frame-Options'] = 'DENY'
-        response['X-XSS-Protection'] = '1; mode=block'
-        response['Referrer-Policy'] = 'strict-origin-when-cross-origin'
+        headers = response.headers
+        for header, value in _SECURITY_HEADERS.items():
+            headers[header] = value
         
         # Remove server header
-        if 'Server' in response:
-            del response['Server']
+        headers.pop('Server', None)
         
         return response
 
@@ -240,44 +294,70 @@ class RequestContextMiddleware(MiddlewareMixin):
                 'session_id': request.session.session_key,
             }
         
+        request._user_context_tokens = (
+            USER_ID.set(request.context['user_id']),
+            USER_ROLE.set(request.context['user_role']),
+        )
+        
         # Add request metadata
         request.context.update({
-            'ip_address': self.get_client_ip(request),
+            'ip_address': get_client_ip(request.META),
             'user_agent': request.META.get('HTTP_USER_AGENT', ''),
-            'request_id': getattr(request, 'id', str(uuid.uuid4())),
+            # Set by RequestLoggingMiddleware when it runs earlier
+            'request_id': getattr(request, 'id', None),
         })
         
         return None
     
-    def get_client_ip(self, request):
-        """Get client IP address."""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+    def process_response(self, request, response):
+        """Drop the user logging context."""
+        if hasattr(request, '_user_context_tokens'):
+            user_id_token, user_role_token = request._user_context_tokens
+            _reset_context_var(USER_ID, user_id_token)
+            _reset_context_var(USER_ROLE, user_role_token)
+        return response
+
+
+# Paths still served while maintenance mode is on
+_HEALTH_PATHS = frozenset({'/health/', '/api/health/'})
 
 
 class MaintenanceModeMiddleware(MiddlewareMixin):
     """Middleware to handle maintenance mode."""
     
+    # Static response body, encoded once
+    _MAINTENANCE_BODY = json.dumps({
+        'error': 'Maintenance Mode',
+        'message': 'System is currently under maintenance. Please try again later.',
+    }).encode()
+    
+    # Read once; refreshed by _refresh_maintenance_mode when overridden in tests
+    _maintenance = getattr(settings, 'MAINTENANCE_MODE', False)
+    
     def process_request(self, request):
         """Check if system is in maintenance mode."""
-        from django.conf import settings
+        if not self._maintenance:
+            return None
         
-        if getattr(settings, 'MAINTENANCE_MODE', False):
-            # Allow admin access
-            if request.path.startswith('/admin/'):
-                return None
-            
-            # Allow health check endpoints
-            if request.path in ['/health/', '/api/health/']:
-                return None
-            
-            return JsonResponse({
-                'error': 'Maintenance Mode',
-                'message': 'System is currently under maintenance. Please try again later.',
-            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        path = request.path
         
-        return None
+        # Allow admin access
+        if path.startswith('/admin/'):
+            return None
+        
+        # Allow health check endpoints
+        if path in _HEALTH_PATHS:
+            return None
+        
+        return HttpResponse(
+            self._MAINTENANCE_BODY,
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content_type='application/json'
+        )
+
+
+@receiver(setting_changed)
+def _refresh_maintenance_mode(setting, value, **kwargs):
+    """Keep MaintenanceModeMiddleware in sync with override_settings."""
+    if setting == 'MAINTENANCE_MODE':
+        MaintenanceModeMiddleware._maintenance = bool(value)
@@ -3,12 +3,110 @@ Base models and mixins for the Hospital Management System.
 Provides reusable model components following DRY principle.
 """
 
-from django.db import models
+from django.db import DEFAULT_DB_ALIAS, NotSupportedError, connections, models
+from django.db.models.expressions import RawSQL
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from typing import Optional
+import functools
 import uuid
 
+from .exceptions import ConcurrencyException
+
+
+def _update_columns(instance: models.Model, **values):
+    """
+    Write only the given columns of a saved instance.
+    Issues a single UPDATE without save() signals or overrides, but with the
+    same bookkeeping as _save_fields: updated_at is stamped, updated_by is
+    written and version is checked and bumped. Unsaved instances are saved
+    normally.
+    
+    Args:
+        instance: Model instance already holding the new values
+        **values: Column values to write
+        
+    Raises:
+        ConcurrencyException: If the stored version no longer matches
+    """
+    if instance.pk is None:
+        instance.save()
+        return
+    
+    model = type(instance)
+    bookkeeping = _bookkeeping_fields(model)
+    queryset = model._base_manager.using(instance._state.db).filter(pk=instance.pk)
+    
+    if 'updated_at' in bookkeeping:
+        instance.updated_at = values['updated_at'] = timezone.now()
+    if 'updated_by' in bookkeeping:
+        attname = model._meta.get_field('updated_by').attname
+        values[attname] = getattr(instance, attname)
+    if 'version' in bookkeeping:
+        queryset = queryset.filter(version=instance.version)
+        values['version'] = models.F('version') + 1
+    
+    updated = queryset.update(**values)
+    
+    if 'version' in bookkeeping:
+        if not updated:
+            raise ConcurrencyException(
+                f"{model.__name__} #{instance.pk} was modified by another request",
+                context={'expected_version': instance.version},
+            )
+        instance.version += 1
+
+
+# Columns maintained by save() overrides that must be written with any field subset
+_BOOKKEEPING_FIELDS = ('updated_at', 'updated_by', 'version')
+
+
+@functools.lru_cache(maxsize=None)
+def _bookkeeping_fields(model: type) -> tuple:
+    """Get the bookkeeping fields a model actually has."""
+    names = {f.name for f in model._meta.concrete_fields}
+    return tuple(name for name in _BOOKKEEPING_FIELDS if name in names)
+
+
+def _bulk_update_columns(queryset, user=None, **values) -> int:
+    """
+    Write the given columns on every row of a queryset in one UPDATE.
+    Same bookkeeping as _update_columns: updated_at is stamped, updated_by is
+    written when a user is given and version is bumped, so stale instances
+    of the updated rows fail their next versioned save.
+    
+    Args:
+        queryset: Records to update
+        user: User performing the update
+        **values: Column values to write
+        
+    Returns:
+        Number of rows updated
+    """
+    bookkeeping = _bookkeeping_fields(queryset.model)
+    if 'updated_at' in bookkeeping:
+        values['updated_at'] = timezone.now()
+    if 'updated_by' in bookkeeping and user is not None:
+        values['updated_by'] = user
+    if 'version' in bookkeeping:
+        values['version'] = models.F('version') + 1
+    return queryset.update(**values)
+
+
+def _save_fields(instance: models.Model, *fields: str):
+    """
+    Save only the given fields of an instance through save().
+    Bookkeeping columns set by the mixins' save overrides are included.
+    
+    Args:
+        instance: Model instance to save
+        *fields: Names of the changed fields
+    """
+    if instance.pk is None:
+        instance.save()
+        return
+    instance.save(update_fields=fields + _bookkeeping_fields(type(instance)))
+
 
 class TimestampMixin(models.Model):
     """
@@ -59,6 +157,31 @@ class AuditMixin(TimestampMixin):
     class Meta:
         abstract = True
     
+    @classmethod
+    def with_audit(cls, queryset):
+        """
+        Join the audit users into a queryset, loading only their key and username.
+        Avoids a query per row when serializers read created_by/updated_by.
+        
+        Args:
+            queryset: Queryset of this model
+            
+        Returns:
+            Queryset with audit users selected
+        """
+        user_model = get_user_model()
+        user_fields = (user_model._meta.pk.name, user_model.USERNAME_FIELD)
+        # The FK columns themselves must stay loaded for Django to attach the users
+        own_fields = [f.name for f in queryset.model._meta.concrete_fields]
+        audit_fields = [
+            f'{relation}__{name}'
+            for relation in ('created_by', 'updated_by')
+            for name in user_fields
+        ]
+        return queryset.select_related('created_by', 'updated_by').only(
+            *own_fields, *audit_fields
+        )
+    
     def save(self, *args, **kwargs):
         """Override save to set audit fields."""
         # Get user from kwargs if provided
@@ -101,6 +224,16 @@ class SoftDeleteMixin(models.Model):
     
     class Meta:
         abstract = True
+        indexes = [
+            # Trash index: covers only deleted rows, in only_deleted() order.
+            # Partial indexes need a name; class names over 24 characters
+            # exceed the 30 character limit and must override it.
+            models.Index(
+                fields=['-deleted_at'],
+                condition=models.Q(is_deleted=True),
+                name='%(class)s_trash',
+            ),
+        ]
     
     def delete(self, using=None, keep_parents=False, soft=True, user=None):
         """
@@ -115,7 +248,7 @@ class SoftDeleteMixin(models.Model):
             self.deleted_at = timezone.now()
             if user:
                 self.deleted_by = user
-            self.save()
+            _save_fields(self, 'is_deleted', 'deleted_at', 'deleted_by')
         else:
             super().delete(using=using, keep_parents=keep_parents)
     
@@ -124,7 +257,23 @@ class SoftDeleteMixin(models.Model):
         self.is_deleted = False
         self.deleted_at = None
         self.deleted_by = None
-        self.save()
+        _save_fields(self, 'is_deleted', 'deleted_at', 'deleted_by')
+    
+    @classmethod
+    def bulk_soft_delete(cls, queryset, user=None) -> int:
+        """
+        Soft delete every record of a queryset in one UPDATE.
+        
+        Args:
+            queryset: Records to delete
+            user: User performing the deletion
+            
+        Returns:
+            Number of rows updated
+        """
+        return _bulk_update_columns(
+            queryset, user=user, is_deleted=True, deleted_at=timezone.now(), deleted_by=user
+        )
     
     @classmethod
     def all_with_deleted(cls):
@@ -133,8 +282,8 @@ class SoftDeleteMixin(models.Model):
     
     @classmethod
     def only_deleted(cls):
-        """Get only soft deleted records."""
-        return cls.objects.filter(is_deleted=True)
+        """Get only soft deleted records, most recently deleted first."""
+        return cls.objects.filter(is_deleted=True).order_by('-deleted_at')
 
 
 class UUIDMixin(models.Model):
@@ -171,6 +320,7 @@ class StatusMixin(models.Model):
         max_length=20,
         choices=STATUS_CHOICES,
         default='active',
+        db_index=True,
         db_column='status',
         help_text='Current status'
     )
@@ -185,12 +335,12 @@ class StatusMixin(models.Model):
     def activate(self):
         """Activate record."""
         self.status = 'active'
-        self.save()
+        _save_fields(self, 'status')
     
     def deactivate(self):
         """Deactivate record."""
         self.status = 'inactive'
-        self.save()
+        _save_fields(self, 'status')
 
 
 class SlugMixin(models.Model):
@@ -226,14 +376,35 @@ class OrderingMixin(models.Model):
         ordering = ['display_order']
 
 
+def mixin_indexes(*mixins) -> list:
+    """
+    Collect the Meta.indexes of abstract mixins.
+    A model inherits Meta from its first base only, so models combining
+    mixins that declare indexes merge them with this helper, e.g.
+    ``indexes = mixin_indexes(BaseModel, PublishableMixin)``.
+    
+    Args:
+        *mixins: Abstract model classes
+        
+    Returns:
+        New list with every mixin's indexes
+    """
+    return [index for mixin in mixins for index in getattr(mixin.Meta, 'indexes', [])]
+
+
 class BaseModel(AuditMixin, SoftDeleteMixin, UUIDMixin):
     """
     Base model with all common mixins.
     All models should inherit from this for consistency.
     """
     
-    class Meta:
+    class Meta(SoftDeleteMixin.Meta):
         abstract = True
+        indexes = mixin_indexes(SoftDeleteMixin) + [
+            # Active rows listed newest first; also serves is_deleted lookups.
+            # Unnamed, so Django derives a name within the length limit.
+            models.Index(fields=['is_deleted', 'created_at']),
+        ]
     
     def __str__(self):
         """Default string representation."""
@@ -254,10 +425,21 @@ class BaseModel(AuditMixin, SoftDeleteMixin, UUIDMixin):
         """Get database table name."""
         return cls._meta.db_table
     
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _dict_fields(cls) -> tuple:
+        """Get (name, attname) pairs of concrete fields, computed once per class."""
+        return tuple((f.name, f.attname) for f in cls._meta.concrete_fields)
+    
     def to_dict(self) -> dict:
         """Convert model instance to dictionary."""
-        from django.forms.models import model_to_dict
-        return model_to_dict(self)
+        # Foreign keys are keyed by field name and hold the related pk
+        return {name: getattr(self, attname) for name, attname in self._dict_fields()}
+
+
+def _recursive_cte(connection) -> str:
+    """Get the recursive CTE prefix; SQL Server and Oracle CTEs recurse without RECURSIVE."""
+    return 'WITH' if connection.vendor in ('microsoft', 'oracle') else 'WITH RECURSIVE'
 
 
 class TreeNodeMixin(models.Model):
@@ -279,41 +461,76 @@ class TreeNodeMixin(models.Model):
     class Meta:
         abstract = True
     
-    def get_ancestors(self):
-        """Get all ancestors of this node."""
-        ancestors = []
-        node = self.parent
-        while node:
-            ancestors.append(node)
-            node = node.parent
-        return ancestors
-    
-    def get_descendants(self):
-        """Get all descendants of this node."""
-        descendants = []
-        children = list(self.children.all())
-        descendants.extend(children)
+    def _get_ancestor_pks(self) -> list:
+        """Get ancestor primary keys, nearest first, in one recursive query."""
+        if self.parent_id is None:
+            return []
+        
+        connection = connections[self._state.db or DEFAULT_DB_ALIAS]
+        qn = connection.ops.quote_name
+        table = qn(self._meta.db_table)
+        pk = qn(self._meta.pk.column)
+        parent = qn(self._meta.get_field('parent').column)
         
-        for child in children:
-            descendants.extend(child.get_descendants())
+        sql = (
+            f"{_recursive_cte(connection)} anc (node_id, parent_id, depth) AS ("
+            f" SELECT {pk}, {parent}, 1 FROM {table} WHERE {pk} = %s"
+            f" UNION ALL"
+            f" SELECT t.{pk}, t.{parent}, anc.depth + 1 FROM {table} t"
+            f" INNER JOIN anc ON t.{pk} = anc.parent_id"
+            f") SELECT node_id FROM anc ORDER BY depth"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [self.parent_id])
+            return [row[0] for row in cursor.fetchall()]
+    
+    def _load_nodes(self, pks: list, fields=None) -> list:
+        """Fetch nodes by primary key in one batch, keeping the order of ``pks``."""
+        queryset = type(self)._base_manager.using(self._state.db)
+        if fields:
+            queryset = queryset.only(*fields)
+        # in_bulk batches the IN list to the backend's parameter limit
+        nodes = queryset.in_bulk(pks)
+        return [nodes[pk] for pk in pks if pk in nodes]
+    
+    def get_ancestors(self, fields=None):
+        """Get all ancestors of this node, optionally loading only ``fields``."""
+        return self._load_nodes(self._get_ancestor_pks(), fields)
+    
+    def _get_descendant_pks(self) -> list:
+        """Get descendant primary keys, level by level, in one recursive query."""
+        connection = connections[self._state.db or DEFAULT_DB_ALIAS]
+        qn = connection.ops.quote_name
+        table = qn(self._meta.db_table)
+        pk = qn(self._meta.pk.column)
+        parent = qn(self._meta.get_field('parent').column)
         
-        return descendants
+        sql = (
+            f"{_recursive_cte(connection)} des (node_id, depth) AS ("
+            f" SELECT {pk}, 1 FROM {table} WHERE {parent} = %s"
+            f" UNION ALL"
+            f" SELECT t.{pk}, des.depth + 1 FROM {table} t"
+            f" INNER JOIN des ON t.{parent} = des.node_id"
+            f") SELECT node_id FROM des ORDER BY depth"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [self.pk])
+            return [row[0] for row in cursor.fetchall()]
+    
+    def get_descendants(self, fields=None):
+        """Get all descendants of this node, optionally loading only ``fields``."""
+        return self._load_nodes(self._get_descendant_pks(), fields)
     
     def get_root(self):
         """Get root node of the tree."""
-        node = self
-        while node.parent:
-            node = node.parent
-        return node
+        ancestor_pks = self._get_ancestor_pks()
+        if not ancestor_pks:
+            return self
+        return type(self)._base_manager.using(self._state.db).get(pk=ancestor_pks[-1])
     
     def get_level(self) -> int:
         """Get level/depth in the tree."""
-        level = 0
-        node = self.parent
-        while node:
-            level += 1
-            node = node.parent
-        return level
+        return len(self._get_ancestor_pks())
     
     def is_root(self) -> bool:
         """Check if this is a root node."""
@@ -321,7 +538,25 @@ class TreeNodeMixin(models.Model):
     
     def is_leaf(self) -> bool:
         """Check if this is a leaf node."""
+        # Set by with_tree_annotations(); saves a query per node in lists
+        child_count = getattr(self, '_child_count', None)
+        if child_count is not None:
+            return child_count == 0
         return not self.children.exists()
+    
+    @classmethod
+    def with_tree_annotations(cls, queryset):
+        """
+        Annotate child counts so is_leaf() needs no query.
+        Use in list views that render many nodes.
+        
+        Args:
+            queryset: Queryset of this model
+            
+        Returns:
+            Annotated queryset
+        """
+        return queryset.annotate(_child_count=models.Count('children'))
 
 
 class VersionedMixin(models.Model):
@@ -339,11 +574,51 @@ class VersionedMixin(models.Model):
     class Meta:
         abstract = True
     
+    # Version the row must still have in the database for the pending UPDATE
+    _expected_version = None
+    
     def save(self, *args, **kwargs):
-        """Increment version on save."""
-        if self.pk:  # Existing record
-            self.version += 1
-        super().save(*args, **kwargs)
+        """
+        Increment version on save, failing if another writer got there first.
+        
+        Raises:
+            ConcurrencyException: If the stored version no longer matches
+        """
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'version' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'version']
+        
+        self._expected_version = self.version
+        self.version += 1
+        try:
+            super().save(*args, **kwargs)
+        except ConcurrencyException:
+            self.version = self._expected_version
+            raise
+        finally:
+            self._expected_version = None
+    
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        """Make the UPDATE conditional on the version read by this instance."""
+        if self._expected_version is None:
+            return super()._do_update(
+                base_qs, using, pk_val, values, update_fields, forced_update
+            )
+        
+        updated = super()._do_update(
+            base_qs.filter(version=self._expected_version),
+            using, pk_val, values, update_fields, forced_update
+        )
+        if not updated:
+            raise ConcurrencyException(
+                f"{self.__class__.__name__} #{pk_val} was modified by another request",
+                context={'expected_version': self._expected_version},
+            )
+        return updated
 
 
 class MetadataMixin(models.Model):
@@ -370,14 +645,39 @@ class MetadataMixin(models.Model):
         if self.metadata is None:
             self.metadata = {}
         self.metadata[key] = value
-        self.save()
+        _update_columns(self, metadata=self.metadata)
     
     def update_metadata(self, data: dict):
         """Update metadata with dictionary."""
         if self.metadata is None:
             self.metadata = {}
         self.metadata.update(data)
-        self.save()
+        _update_columns(self, metadata=self.metadata)
+    
+    @classmethod
+    def where_metadata(cls, queryset, key: str, value):
+        """
+        Filter records whose metadata has key set to value, in the database.
+        
+        Args:
+            queryset: Queryset of this model
+            key: Metadata key
+            value: Expected value
+            
+        Returns:
+            Filtered queryset
+        """
+        if connections[queryset.db].features.supports_json_field_contains:
+            return queryset.filter(metadata__contains={key: value})
+        return queryset.filter(**{f'metadata__{key}': value})
+
+
+# Table-valued functions listing JSON array elements, for backends without
+# JSON containment lookups
+_JSON_ARRAY_FUNCTIONS = {
+    'microsoft': 'OPENJSON',
+    'sqlite': 'json_each',
+}
 
 
 class TaggableMixin(models.Model):
@@ -399,22 +699,56 @@ class TaggableMixin(models.Model):
         """Add a tag."""
         if tag not in self.tags:
             self.tags.append(tag)
-            self.save()
+            _update_columns(self, tags=self.tags)
     
     def remove_tag(self, tag: str):
         """Remove a tag."""
         if tag in self.tags:
             self.tags.remove(tag)
-            self.save()
+            _update_columns(self, tags=self.tags)
     
     def has_tag(self, tag: str) -> bool:
         """Check if has a tag."""
         return tag in self.tags
     
+    @classmethod
+    def with_tag(cls, queryset, tag: str):
+        """
+        Filter records carrying a tag, in the database.
+        
+        Args:
+            queryset: Queryset of this model
+            tag: Tag to match
+            
+        Returns:
+            Filtered queryset
+        """
+        connection = connections[queryset.db]
+        if connection.features.supports_json_field_contains:
+            return queryset.filter(tags__contains=[tag])
+        
+        # No JSON containment (SQL Server, SQLite): match the array elements
+        json_elements = _JSON_ARRAY_FUNCTIONS.get(connection.vendor)
+        if json_elements is None:
+            raise NotSupportedError(
+                f'with_tag() is not supported on {connection.vendor}'
+            )
+        qn = connection.ops.quote_name
+        opts = queryset.model._meta
+        column = f"{qn(opts.db_table)}.{qn(opts.get_field('tags').column)}"
+        # CASE yields an integer, comparable in WHERE on every backend
+        has_tag = RawSQL(
+            f"CASE WHEN EXISTS (SELECT 1 FROM {json_elements}({column}) "
+            f"WHERE {qn('value')} = %s) THEN 1 ELSE 0 END",
+            [tag],
+            output_field=models.IntegerField(),
+        )
+        return queryset.annotate(_has_tag=has_tag).filter(_has_tag=1)
+    
     def clear_tags(self):
         """Clear all tags."""
         self.tags = []
-        self.save()
+        _update_columns(self, tags=self.tags)
 
 
 class PublishableMixin(models.Model):
@@ -436,18 +770,38 @@ class PublishableMixin(models.Model):
     
     class Meta:
         abstract = True
+        # Combine with other mixins' indexes through mixin_indexes()
+        indexes = [
+            models.Index(fields=['is_published', 'published_at']),
+        ]
     
     def publish(self):
         """Publish content."""
         self.is_published = True
         self.published_at = timezone.now()
-        self.save()
+        _save_fields(self, 'is_published', 'published_at')
     
     def unpublish(self):
         """Unpublish content."""
         self.is_published = False
         self.published_at = None
-        self.save()
+        _save_fields(self, 'is_published', 'published_at')
+    
+    @classmethod
+    def bulk_publish(cls, queryset, user=None) -> int:
+        """
+        Publish every record of a queryset in one UPDATE.
+        
+        Args:
+            queryset: Records to publish
+            user: User publishing the records
+            
+        Returns:
+            Number of rows updated
+        """
+        return _bulk_update_columns(
+            queryset, user=user, is_published=True, published_at=timezone.now()
+        )
 
 
 # Query Managers
@@ -455,9 +809,8 @@ class ActiveManager(models.Manager):
     """Manager for active records only."""
     
     def get_queryset(self):
-        return super().get_queryset().filter(
-            models.Q(is_deleted=False) | models.Q(is_deleted__isnull=True)
-        )
+        # is_deleted is non-nullable with default False
+        return super().get_queryset().filter(is_deleted=False)
 
 
 class PublishedManager(models.Manager):
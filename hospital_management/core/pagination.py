@@ -5,12 +5,130 @@ Implements enhanced pagination with metadata and performance optimizations.
 
 from rest_framework.pagination import PageNumberPagination, LimitOffsetPagination, CursorPagination
 from rest_framework.response import Response
-from collections import OrderedDict
-from django.core.paginator import InvalidPage
+from rest_framework.utils.urls import replace_query_param
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import EmptyPage, InvalidPage, Page, PageNotAnInteger, Paginator
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.db.models import QuerySet
+from django.db.models.query import ModelIterable
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from typing import Dict, Any, Optional
 import math
 
+from .models import AuditMixin
+
+
+# Tables at least this large report an estimated count for unfiltered listings
+ESTIMATED_COUNT_THRESHOLD = 100000
+
+
+def estimate_row_count(model, using: str = DEFAULT_DB_ALIAS) -> Optional[int]:
+    """
+    Get the planner's row estimate for a model's table without scanning it.
+    
+    Args:
+        model: Model class
+        using: Database alias
+        
+    Returns:
+        Estimated row count, or None if the backend offers no estimate
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    
+    if connection.vendor == 'microsoft':
+        sql = (
+            "SELECT SUM(row_count) FROM sys.dm_db_partition_stats "
+            "WHERE object_id = OBJECT_ID(%s) AND index_id IN (0, 1)"
+        )
+    elif connection.vendor == 'postgresql':
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE relname = %s"
+    else:
+        return None
+    
+    try:
+        # Savepoint so a failed catalog query cannot abort an enclosing transaction
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class _ProbedPage(Page):
+    """Page whose has_next comes from fetching one extra row, not from the count."""
+    
+    def __init__(self, object_list, number, paginator, has_next: bool):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+    
+    def has_next(self):
+        return self._has_next
+    
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that skips COUNT(*) for unfiltered listings of large tables,
+    using the database's row estimate instead. `approximate` tells whether
+    count and num_pages come from the estimate; they are then only shown,
+    and pages are bounded by fetching one row past the page instead.
+    """
+    
+    approximate = False
+    
+    @staticmethod
+    def _can_estimate(object_list) -> bool:
+        """Whether the table's row count is the queryset's row count."""
+        if not isinstance(object_list, QuerySet):
+            return False
+        query = object_list.query
+        return not (query.where or query.distinct or query.combinator
+                    or query.group_by is not None)
+    
+    @cached_property
+    def count(self):
+        object_list = self.object_list
+        if self._can_estimate(object_list):
+            estimate = estimate_row_count(object_list.model, object_list.db)
+            if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+                self.approximate = True
+                return estimate
+        return super().count
+    
+    def validate_number(self, number):
+        """Validate a page number; an estimated count sets no upper bound."""
+        # Evaluating count decides whether it is approximate
+        if not (self.count and self.approximate):
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+    
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.approximate:
+            return super().page(number)
+        
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+        return _ProbedPage(rows[:self.per_page], number, self, len(rows) > self.per_page)
+
 
 class CustomPageNumberPagination(PageNumberPagination):
     """Enhanced page number pagination with metadata."""
@@ -20,31 +138,40 @@ class CustomPageNumberPagination(PageNumberPagination):
     max_page_size = 100
     page_query_param = 'page'
     
+    django_paginator_class = EstimatedCountPaginator
+    
     def get_paginated_response(self, data):
         """Return paginated response with enhanced metadata."""
-        return Response(OrderedDict([
-            ('status', 'success'),
-            ('pagination', {
-                'count': self.page.paginator.count,
-                'total_pages': self.page.paginator.num_pages,
-                'current_page': self.page.number,
-                'page_size': self.get_page_size(self.request),
-                'has_next': self.page.has_next(),
-                'has_previous': self.page.has_previous(),
-                'next_page': self.page.next_page_number() if self.page.has_next() else None,
-                'previous_page': self.page.previous_page_number() if self.page.has_previous() else None,
-                'start_index': self.page.start_index(),
-                'end_index': self.page.end_index(),
-            }),
-            ('links', {
+        page = self.page
+        paginator = page.paginator
+        has_next = page.has_next()
+        has_previous = page.has_previous()
+        
+        return Response({
+            'status': 'success',
+            'pagination': {
+                'count': paginator.count,
+                'approximate_count': getattr(paginator, 'approximate', False),
+                'total_pages': paginator.num_pages,
+                'current_page': page.number,
+                # Page size resolved by paginate_queryset
+                'page_size': paginator.per_page,
+                'has_next': has_next,
+                'has_previous': has_previous,
+                'next_page': page.next_page_number() if has_next else None,
+                'previous_page': page.previous_page_number() if has_previous else None,
+                'start_index': page.start_index(),
+                'end_index': page.end_index(),
+            },
+            'links': {
                 'next': self.get_next_link(),
                 'previous': self.get_previous_link(),
                 'first': self.get_first_link(),
                 'last': self.get_last_link(),
-            }),
-            ('data', data),
-            ('message', f'Retrieved {len(data)} items from page {self.page.number}')
-        ]))
+            },
+            'data': data,
+            'message': f'Retrieved {len(data)} items from page {self.page.number}'
+        })
     
     def get_first_link(self):
         """Get link to first page."""
@@ -52,26 +179,16 @@ class CustomPageNumberPagination(PageNumberPagination):
             return None
         
         url = self.request.build_absolute_uri()
-        return self.replace_query_param(url, self.page_query_param, 1)
+        return replace_query_param(url, self.page_query_param, 1)
     
     def get_last_link(self):
-        """Get link to last page."""
-        if self.page.number >= self.page.paginator.num_pages:
+        """Get link to last page, unless the page count is only estimated."""
+        paginator = self.page.paginator
+        if getattr(paginator, 'approximate', False) or self.page.number >= paginator.num_pages:
             return None
         
         url = self.request.build_absolute_uri()
-        return self.replace_query_param(url, self.page_query_param, self.page.paginator.num_pages)
-    
-    def replace_query_param(self, url, key, val):
-        """Replace query parameter in URL."""
-        from django.utils.http import urlencode
-        from urllib.parse import urlparse, parse_qs, urlunparse
-        
-        parsed = urlparse(url)
-        query_params = parse_qs(parsed.query)
-        query_params[key] = [str(val)]
-        new_query = urlencode(query_params, doseq=True)
-        return urlunparse(parsed._replace(query=new_query))
+        return replace_query_param(url, self.page_query_param, paginator.num_pages)
 
 
 class OptimizedLimitOffsetPagination(LimitOffsetPagination):
@@ -85,23 +202,27 @@ class OptimizedLimitOffsetPagination(LimitOffsetPagination):
     def get_paginated_response(self, data):
         """Return paginated response with performance metrics."""
         total_count = self.count if hasattr(self, 'count') else len(data)
+        # Limit and offset resolved by paginate_queryset
+        offset = self.offset
+        next_link = self.get_next_link()
+        previous_link = self.get_previous_link()
         
-        return Response(OrderedDict([
-            ('status', 'success'),
-            ('pagination', {
+        return Response({
+            'status': 'success',
+            'pagination': {
                 'count': total_count,
-                'limit': self.get_limit(self.request),
-                'offset': self.get_offset(self.request),
-                'has_next': self.get_next_link() is not None,
-                'has_previous': self.get_previous_link() is not None,
-            }),
-            ('links', {
-                'next': self.get_next_link(),
-                'previous': self.get_previous_link(),
-            }),
-            ('data', data),
-            ('message', f'Retrieved {len(data)} items with offset {self.get_offset(self.request)}')
-        ]))
+                'limit': self.limit,
+                'offset': offset,
+                'has_next': next_link is not None,
+                'has_previous': previous_link is not None,
+            },
+            'links': {
+                'next': next_link,
+                'previous': previous_link,
+            },
+            'data': data,
+            'message': f'Retrieved {len(data)} items with offset {offset}'
+        })
 
 
 class CursorBasedPagination(CursorPagination):
@@ -115,20 +236,42 @@ class CursorBasedPagination(CursorPagination):
     
     def get_paginated_response(self, data):
         """Return cursor-paginated response."""
-        return Response(OrderedDict([
-            ('status', 'success'),
-            ('pagination', {
-                'page_size': self.get_page_size(self.request),
+        return Response({
+            'status': 'success',
+            'pagination': {
+                # Page size resolved by paginate_queryset
+                'page_size': self.page_size,
                 'has_next': self.has_next,
                 'has_previous': self.has_previous,
-            }),
-            ('links', {
+            },
+            'links': {
                 'next': self.get_next_link(),
                 'previous': self.get_previous_link(),
-            }),
-            ('data', data),
-            ('message', f'Retrieved {len(data)} items using cursor pagination')
-        ]))
+            },
+            'data': data,
+            'message': f'Retrieved {len(data)} items using cursor pagination'
+        })
+
+
+class KeysetPagination(CursorBasedPagination):
+    """
+    Keyset pagination over an indexed ordering.
+    Each page seeks past the previous one instead of scanning an OFFSET.
+    Models use ma_* primary keys, so the tie-breaker is pk, not id.
+    """
+    
+    ordering = ('-created_at', '-pk')
+    
+    @staticmethod
+    def supports(queryset) -> bool:
+        """Check that a queryset's model has the created_at keyset column."""
+        if not isinstance(queryset, QuerySet):
+            return False
+        try:
+            queryset.model._meta.get_field('created_at')
+        except FieldDoesNotExist:
+            return False
+        return True
 
 
 class SmartPagination:
@@ -143,9 +286,12 @@ class SmartPagination:
         """Choose and apply the best pagination strategy."""
         # Determine best pagination strategy
         strategy = self._determine_strategy()
+        if strategy == 'cursor' and not KeysetPagination.supports(self.queryset):
+            # No created_at to seek on; offsets work for any ordering
+            strategy = 'offset'
         
         if strategy == 'cursor':
-            paginator = CursorBasedPagination()
+            paginator = KeysetPagination()
         elif strategy == 'offset':
             paginator = OptimizedLimitOffsetPagination()
         else:
@@ -165,20 +311,47 @@ class SmartPagination:
     
     def _determine_strategy(self) -> str:
         """Determine the best pagination strategy."""
+        # Explicit choice from the view
+        if 'strategy' in self.context:
+            return self.context['strategy']
+        
         # Check for real-time requirements
         if self.context.get('real_time', False):
             return 'cursor'
         
-        # Check dataset size
-        if hasattr(self.queryset, 'count'):
-            count = self.queryset.count()
-            if count > 10000:
+        # A cursor from a previous page keeps the client on keyset pagination
+        if self.request.query_params.get(KeysetPagination.cursor_query_param):
+            return 'cursor'
+        
+        if isinstance(self.queryset, QuerySet):
+            # Newest-first listings already match the keyset ordering
+            ordering = self.queryset.query.order_by or self.queryset.model._meta.ordering
+            if ordering and ordering[0] == KeysetPagination.ordering[0]:
+                return 'cursor'
+            
+            # Last resort: past a few pages OFFSET scans cost more than a keyset seek
+            if self._estimate_count() > 1000:
                 return 'cursor'
-            elif count > 1000:
-                return 'offset'
         
         # Default to page number pagination
         return 'page'
+    
+    def _estimate_count(self) -> int:
+        """
+        Estimate the dataset size. Unfiltered querysets use the table's row
+        estimate; filtered ones, or backends without an estimate, run
+        COUNT(*), so the response format never depends on the size of rows
+        the filter excludes. Cached on the request.
+        """
+        estimate = getattr(self.request, '_pagination_count_estimate', None)
+        if estimate is None:
+            queryset = self.queryset
+            if not queryset.query.where:
+                estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is None:
+                estimate = queryset.count()
+            self.request._pagination_count_estimate = estimate
+        return estimate
 
 
 class SearchResultsPagination(CustomPageNumberPagination):
@@ -192,28 +365,28 @@ class SearchResultsPagination(CustomPageNumberPagination):
         search_query = self.request.query_params.get('q', '')
         search_time = self.context.get('search_time', 0) if hasattr(self, 'context') else 0
         
-        return Response(OrderedDict([
-            ('status', 'success'),
-            ('search_metadata', {
+        return Response({
+            'status': 'success',
+            'search_metadata': {
                 'query': search_query,
                 'search_time_ms': round(search_time * 1000, 2),
                 'total_results': self.page.paginator.count,
-                'results_per_page': self.get_page_size(self.request),
-            }),
-            ('pagination', {
+                'results_per_page': self.page.paginator.per_page,
+            },
+            'pagination': {
                 'count': self.page.paginator.count,
                 'total_pages': self.page.paginator.num_pages,
                 'current_page': self.page.number,
                 'has_next': self.page.has_next(),
                 'has_previous': self.page.has_previous(),
-            }),
-            ('links', {
+            },
+            'links': {
                 'next': self.get_next_link(),
                 'previous': self.get_previous_link(),
-            }),
-            ('results', data),
-            ('message', f'Found {self.page.paginator.count} results for "{search_query}"')
-        ]))
+            },
+            'results': data,
+            'message': f'Found {self.page.paginator.count} results for "{search_query}"'
+        })
 
 
 class DashboardPagination(CustomPageNumberPagination):
@@ -226,19 +399,19 @@ class DashboardPagination(CustomPageNumberPagination):
         """Return dashboard data with pagination and summary statistics."""
         summary = self.context.get('summary', {}) if hasattr(self, 'context') else {}
         
-        return Response(OrderedDict([
-            ('status', 'success'),
-            ('summary', summary),
-            ('pagination', {
+        return Response({
+            'status': 'success',
+            'summary': summary,
+            'pagination': {
                 'count': self.page.paginator.count,
                 'current_page': self.page.number,
                 'total_pages': self.page.paginator.num_pages,
                 'has_next': self.page.has_next(),
                 'has_previous': self.page.has_previous(),
-            }),
-            ('data', data),
-            ('message', f'Dashboard page {self.page.number} of {self.page.paginator.num_pages}')
-        ]))
+            },
+            'data': data,
+            'message': f'Dashboard page {self.page.number} of {self.page.paginator.num_pages}'
+        })
 
 
 class InfinitePagination(LimitOffsetPagination):
@@ -249,19 +422,20 @@ class InfinitePagination(LimitOffsetPagination):
     
     def get_paginated_response(self, data):
         """Return response optimized for infinite scroll."""
-        next_offset = None
-        if self.get_next_link():
-            next_offset = self.get_offset(self.request) + self.get_limit(self.request)
+        offset = self.offset
+        limit = self.limit
+        # Same check as get_next_link(), without building the URL
+        has_more = offset + limit < self.count
         
-        return Response(OrderedDict([
-            ('status', 'success'),
-            ('has_more': self.get_next_link() is not None,
-            ('next_offset': next_offset,
-            ('current_offset': self.get_offset(self.request),
-            ('limit': self.get_limit(self.request),
-            ('data', data),
-            ('message', f'Loaded {len(data)} more items')
-        ]))
+        return Response({
+            'status': 'success',
+            'has_more': has_more,
+            'next_offset': offset + limit if has_more else None,
+            'current_offset': offset,
+            'limit': limit,
+            'data': data,
+            'message': f'Loaded {len(data)} more items'
+        })
 
 
 class PerformancePagination(CustomPageNumberPagination):
@@ -283,6 +457,14 @@ class PerformancePagination(CustomPageNumberPagination):
         if hasattr(view, 'pagination_prefetch_related'):
             queryset = queryset.prefetch_related(*view.pagination_prefetch_related)
         
+        # Audit users are read per row by serializers. Only model-instance
+        # querysets without the view's own only()/defer() are adjusted.
+        if (isinstance(queryset, QuerySet)
+                and issubclass(queryset.model, AuditMixin)
+                and queryset._iterable_class is ModelIterable
+                and queryset.query.deferred_loading == (frozenset(), True)):
+            queryset = queryset.model.with_audit(queryset)
+        
         return super().paginate_queryset(queryset, request, view)
     
     def get_paginated_response(self, data):
@@ -325,20 +507,22 @@ class CustomPaginationMixin:
         return self.paginator.get_paginated_response(data)
 
 
+_PAGINATION_CLASSES = {
+    'default': CustomPageNumberPagination,
+    'page': CustomPageNumberPagination,
+    'offset': OptimizedLimitOffsetPagination,
+    'cursor': CursorBasedPagination,
+    'keyset': KeysetPagination,
+    'search': SearchResultsPagination,
+    'dashboard': DashboardPagination,
+    'infinite': InfinitePagination,
+    'performance': PerformancePagination,
+}
+
+
 def get_pagination_class(pagination_type: str = 'default'):
     """Factory function to get appropriate pagination class."""
-    pagination_classes = {
-        'default': CustomPageNumberPagination,
-        'page': CustomPageNumberPagination,
-        'offset': OptimizedLimitOffsetPagination,
-        'cursor': CursorBasedPagination,
-        'search': SearchResultsPagination,
-        'dashboard': DashboardPagination,
-        'infinite': InfinitePagination,
-        'performance': PerformancePagination,
-    }
-    
-    return pagination_classes.get(pagination_type, CustomPageNumberPagination)
+    return _PAGINATION_CLASSES.get(pagination_type, CustomPageNumberPagination)
 
 
 def calculate_pagination_stats(total_count: int, page_size: int, current_page: int) -> Dict[str, Any]:
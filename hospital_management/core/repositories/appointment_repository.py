@@ -4,7 +4,8 @@ Handles data access for appointments and scheduling.
 """
 
 from typing import Optional, List, Dict, Any
-from django.db.models import Q, QuerySet, Count, F
+from django.db import transaction
+from django.db.models import QuerySet, Count, F
 from django.utils import timezone
 from datetime import datetime, date, timedelta
 from .base import BaseRepository, CachedRepository
@@ -18,84 +19,115 @@ class AppointmentRepository(CachedRepository):
     Repository for LichHen (Appointment) model.
     """
     
+    select_related_fields = ('ma_benh_nhan', 'ma_bac_si', 'ma_dich_vu', 'ma_lich')
+    # Columns loaded by lean list queries
+    list_fields = ('ma_lich_hen', 'ma_benh_nhan_id', 'ma_bac_si_id',
+                   'ngay_kham', 'gio_kham', 'trang_thai')
+    
     def __init__(self):
         from appointments.models import LichHen
         super().__init__(LichHen, cache_timeout=300)  # 5 minutes cache
     
-    def find_by_patient(self, patient_id: int) -> QuerySet:
+    def _find(self, lean: bool, **filters) -> QuerySet:
+        """
+        Filter appointments, loading only list_fields without joins when lean.
+        Lean results suit compact lists; serializers reading other fields
+        should use the full queryset to avoid a query per deferred field.
+        """
+        if not lean:
+            return self.get_all(**filters)
+        return self.model._default_manager.filter(**filters).only(*self.list_fields)
+    
+    def find_by_patient(self, patient_id: int, lean: bool = False) -> QuerySet:
         """
         Find appointments by patient.
         
         Args:
             patient_id: Patient ID
+            lean: Load only list_fields
             
         Returns:
             QuerySet of appointments
         """
-        return self.get_all(ma_benh_nhan_id=patient_id).order_by('-ngay_kham')
+        return self._find(lean, ma_benh_nhan_id=patient_id).order_by('-ngay_kham')
     
-    def find_by_doctor(self, doctor_id: int) -> QuerySet:
+    def find_by_doctor(self, doctor_id: int, lean: bool = False) -> QuerySet:
         """
         Find appointments by doctor.
         
         Args:
             doctor_id: Doctor ID
+            lean: Load only list_fields
             
         Returns:
             QuerySet of appointments
         """
-        return self.get_all(ma_bac_si_id=doctor_id).order_by('ngay_kham', 'gio_kham')
+        return self._find(lean, ma_bac_si_id=doctor_id).order_by('ngay_kham', 'gio_kham')
     
-    def find_by_date(self, appointment_date: date) -> QuerySet:
+    def find_by_date(self, appointment_date: date, lean: bool = False) -> QuerySet:
         """
         Find appointments by date.
         
         Args:
             appointment_date: Appointment date
+            lean: Load only list_fields
             
         Returns:
             QuerySet of appointments
         """
-        return self.get_all(ngay_kham=appointment_date).order_by('gio_kham')
+        return self._find(lean, ngay_kham=appointment_date).order_by('gio_kham')
     
-    def find_by_status(self, status: str) -> QuerySet:
+    def find_by_status(self, status: str, lean: bool = False) -> QuerySet:
         """
         Find appointments by status.
         
         Args:
             status: Appointment status
+            lean: Load only list_fields
             
         Returns:
             QuerySet of appointments
         """
-        return self.get_all(trang_thai=status)
+        return self._find(lean, trang_thai=status)
     
-    def find_upcoming(self, days: int = 7) -> QuerySet:
+    def find_upcoming(self, days: int = 7, lean: bool = False) -> QuerySet:
         """
         Find upcoming appointments.
         
         Args:
             days: Number of days to look ahead
+            lean: Load only list_fields plus the doctor's name
             
         Returns:
             QuerySet of upcoming appointments
         """
-        end_date = timezone.now().date() + timedelta(days=days)
-        return self.get_all(
-            ngay_kham__gte=timezone.now().date(),
+        today = timezone.localdate()
+        end_date = today + timedelta(days=days)
+        queryset = self._find(
+            lean,
+            ngay_kham__gte=today,
             ngay_kham__lte=end_date,
             trang_thai__in=['Cho xac nhan', 'Da xac nhan']
         ).order_by('ngay_kham', 'gio_kham')
+        if lean:
+            queryset = queryset.select_related('ma_bac_si').only(
+                *self.list_fields, 'ma_bac_si__ho_ten'
+            )
+        return queryset
     
-    def find_overdue(self) -> QuerySet:
+    def find_overdue(self, lean: bool = False) -> QuerySet:
         """
         Find overdue appointments.
         
+        Args:
+            lean: Load only list_fields
+            
         Returns:
             QuerySet of overdue appointments
         """
-        return self.get_all(
-            ngay_kham__lt=timezone.now().date(),
+        return self._find(
+            lean,
+            ngay_kham__lt=timezone.localdate(),
             trang_thai='Cho xac nhan'
         )
     
@@ -109,18 +141,39 @@ class AppointmentRepository(CachedRepository):
         Returns:
             Appointment instance with details
         """
-        return self.get_queryset().select_related(
-            'ma_benh_nhan',
-            'ma_bac_si',
-            'ma_dich_vu',
-            'ma_lich'
-        ).prefetch_related(
+        return self.get_queryset().prefetch_related(
             'thanh_toan',
             'phien_tu_van'
         ).filter(pk=appointment_id).first()
     
+    def _slot_key(self, doctor_id: Any, appointment_date: Any, appointment_time: Any) -> tuple:
+        """Build a (doctor, date, time) busy slot key from raw or typed values."""
+        meta = self.model._meta
+        return (
+            meta.get_field('ma_bac_si').to_python(doctor_id),
+            meta.get_field('ngay_kham').to_python(appointment_date),
+            meta.get_field('gio_kham').to_python(appointment_time),
+        )
+    
+    def get_busy_slots(self, doctor_id: int, appointment_date: date) -> set:
+        """
+        Get the booked appointment slots of a doctor on a date in one query.
+        
+        Args:
+            doctor_id: Doctor ID
+            appointment_date: Appointment date
+            
+        Returns:
+            Set of booked (doctor_id, date, time) slot keys
+        """
+        return set(self.model._default_manager.filter(
+            ma_bac_si_id=doctor_id,
+            ngay_kham=appointment_date,
+            trang_thai__in=['Cho xac nhan', 'Da xac nhan']
+        ).values_list('ma_bac_si_id', 'ngay_kham', 'gio_kham'))
+    
     def check_time_slot_availability(self, doctor_id: int, appointment_date: date, 
-                                     appointment_time: Any) -> bool:
+                                     appointment_time: Any, busy: Optional[set] = None) -> bool:
         """
         Check if time slot is available.
         
@@ -128,10 +181,15 @@ class AppointmentRepository(CachedRepository):
             doctor_id: Doctor ID
             appointment_date: Appointment date
             appointment_time: Appointment time
+            busy: Booked slots from get_busy_slots, to check many slots
+                without a query each
             
         Returns:
             True if available, False otherwise
         """
+        if busy is not None:
+            return self._slot_key(doctor_id, appointment_date, appointment_time) not in busy
+        
         existing = self.get_all(
             ma_bac_si_id=doctor_id,
             ngay_kham=appointment_date,
@@ -255,31 +313,29 @@ class AppointmentRepository(CachedRepository):
         Returns:
             Dictionary with statistics
         """
-        queryset = self.get_queryset()
+        queryset = self.model._default_manager.all()
         
         if start_date:
             queryset = queryset.filter(ngay_kham__gte=start_date)
         if end_date:
             queryset = queryset.filter(ngay_kham__lte=end_date)
         
-        stats = queryset.aggregate(
-            total=Count('ma_lich_hen'),
-            pending=Count('ma_lich_hen', filter=Q(trang_thai='Cho xac nhan')),
-            confirmed=Count('ma_lich_hen', filter=Q(trang_thai='Da xac nhan')),
-            completed=Count('ma_lich_hen', filter=Q(trang_thai='Hoan thanh')),
-            cancelled=Count('ma_lich_hen', filter=Q(trang_thai='Da huy'))
+        # One GROUP BY over the (trang_thai, ngay_kham) index
+        counts = dict(
+            queryset.order_by().values_list('trang_thai').annotate(c=Count('*'))
         )
+        total = sum(counts.values())
+        completed = counts.get('Hoan thanh', 0)
+        cancelled = counts.get('Da huy', 0)
         
         return {
-            'total_appointments': stats['total'],
-            'pending_appointments': stats['pending'],
-            'confirmed_appointments': stats['confirmed'],
-            'completed_appointments': stats['completed'],
-            'cancelled_appointments': stats['cancelled'],
-            'completion_rate': (stats['completed'] / stats['total'] * 100) 
-                             if stats['total'] > 0 else 0,
-            'cancellation_rate': (stats['cancelled'] / stats['total'] * 100) 
-                               if stats['total'] > 0 else 0
+            'total_appointments': total,
+            'pending_appointments': counts.get('Cho xac nhan', 0),
+            'confirmed_appointments': counts.get('Da xac nhan', 0),
+            'completed_appointments': completed,
+            'cancelled_appointments': cancelled,
+            'completion_rate': (completed / total * 100) if total > 0 else 0,
+            'cancellation_rate': (cancelled / total * 100) if total > 0 else 0
         }
 
 
@@ -370,24 +426,21 @@ class ScheduleRepository(BaseRepository):
             increment: True to increment, False to decrement
             
         Returns:
-            True if updated successfully
+            True if updated successfully, False if the schedule is missing,
+            full (increment) or already empty (decrement)
         """
         try:
-            schedule = self.get_by_id(schedule_id)
-            if not schedule:
-                return False
-            
+            # Single conditional UPDATE so concurrent bookings cannot oversell
+            queryset = self.model._default_manager.filter(pk=schedule_id)
             if increment:
-                if schedule.so_luong_da_dat < schedule.so_luong_kham:
-                    schedule.so_luong_da_dat += 1
-                else:
-                    return False  # No available slots
+                updated = queryset.filter(
+                    so_luong_da_dat__lt=F('so_luong_kham')
+                ).update(so_luong_da_dat=F('so_luong_da_dat') + 1)
             else:
-                if schedule.so_luong_da_dat > 0:
-                    schedule.so_luong_da_dat -= 1
-            
-            schedule.save()
-            return True
+                updated = queryset.filter(
+                    so_luong_da_dat__gt=0
+                ).update(so_luong_da_dat=F('so_luong_da_dat') - 1)
+            return updated == 1
             
         except Exception as e:
             logger.error(f"Error updating slot count: {str(e)}")
@@ -470,7 +523,7 @@ class TeleconsultationRepository(BaseRepository):
             if call_id:
                 session.ma_cuoc_goi = call_id
             
-            session.save()
+            session.save(update_fields=['trang_thai', 'thoi_gian_bat_dau', 'ma_cuoc_goi'])
             return True
             
         except Exception as e:
@@ -498,12 +551,18 @@ class TeleconsultationRepository(BaseRepository):
             if notes:
                 session.ghi_chu_bac_si = notes
             
-            session.save()
-            
-            # Update appointment status
-            if session.ma_lich_hen:
-                session.ma_lich_hen.trang_thai = 'Hoan thanh'
-                session.ma_lich_hen.save()
+            with transaction.atomic():
+                session.save(update_fields=['trang_thai', 'thoi_gian_ket_thuc', 'ghi_chu_bac_si'])
+                
+                # Update appointment status without loading the appointment
+                appointment_id = session.ma_lich_hen_id
+                if appointment_id:
+                    from appointments.models import LichHen
+                    LichHen.objects.filter(pk=appointment_id).update(trang_thai='Hoan thanh')
+                    # update() sends no post_save, so drop the cached appointment explicitly
+                    transaction.on_commit(
+                        lambda: AppointmentRepository().invalidate_cache('get_by_id', appointment_id)
+                    )
             
             return True
             
@@ -6,7 +6,8 @@ Provides abstraction layer for data access with common CRUD operations.
 from typing import Generic, TypeVar, Optional, List, Dict, Any, Type
 from django.db import models, transaction
 from django.db.models import Q, QuerySet
-from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import post_delete, post_save
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.core.paginator import Paginator
 from abc import ABC, abstractmethod
 import logging
@@ -15,6 +16,11 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar('T', bound=models.Model)
 
+# Cached marker for ids known not to exist; a string survives pickling
+# through the cache backend where a bare object() would not
+_MISS = '__repository_miss__'
+MISS_CACHE_TIMEOUT = 30
+
 
 class IRepository(ABC, Generic[T]):
     """
@@ -62,8 +68,14 @@ class BaseRepository(IRepository[T]):
     """
     Base repository implementing common data access patterns.
     Follows SOLID principles with single responsibility for data access.
+    
+    Subclasses opt in to eager loading by listing relations in
+    ``select_related_fields`` and ``prefetch_related_fields``.
     """
     
+    select_related_fields: tuple = ()
+    prefetch_related_fields: tuple = ()
+    
     def __init__(self, model: Type[T]):
         """
         Initialize repository with model class.
@@ -72,7 +84,6 @@ class BaseRepository(IRepository[T]):
             model: Django model class
         """
         self.model = model
-        self._queryset = model.objects.all()
         
     def get_queryset(self) -> QuerySet[T]:
         """
@@ -81,7 +92,12 @@ class BaseRepository(IRepository[T]):
         Returns:
             QuerySet for the model
         """
-        return self._queryset.select_related().prefetch_related()
+        queryset = self.model._default_manager.all()
+        if self.select_related_fields:
+            queryset = queryset.select_related(*self.select_related_fields)
+        if self.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*self.prefetch_related_fields)
+        return queryset
     
     def get_by_id(self, id: Any) -> Optional[T]:
         """
@@ -142,11 +158,13 @@ class BaseRepository(IRepository[T]):
             
         return queryset
     
-    def create(self, **data) -> T:
+    def create(self, validate: bool = True, **data) -> T:
         """
         Create new entity.
         
         Args:
+            validate: Run full_clean() before saving; pass False only when
+                the data was already validated upstream
             **data: Field values for new entity
             
         Returns:
@@ -157,7 +175,8 @@ class BaseRepository(IRepository[T]):
         """
         try:
             instance = self.model(**data)
-            instance.full_clean()  # Validate before saving
+            if validate:
+                instance.full_clean()
             instance.save()
             logger.info(f"Created {self.model.__name__} with id {instance.pk}")
             return instance
@@ -185,12 +204,13 @@ class BaseRepository(IRepository[T]):
             logger.error(f"Error bulk creating {self.model.__name__}: {str(e)}")
             raise ValueError(f"Failed to bulk create {self.model.__name__}: {str(e)}")
     
-    def update(self, id: Any, **data) -> Optional[T]:
+    def update(self, id: Any, validate: bool = True, **data) -> Optional[T]:
         """
         Update existing entity.
         
         Args:
             id: Primary key value
+            validate: Run full_clean() before saving
             **data: Field values to update
             
         Returns:
@@ -204,7 +224,9 @@ class BaseRepository(IRepository[T]):
             for key, value in data.items():
                 setattr(instance, key, value)
                 
-            instance.full_clean()  # Validate before saving
+            if validate:
+                instance.full_clean()
+            # Full save: model save() overrides may derive other columns
             instance.save()
             logger.info(f"Updated {self.model.__name__} with id {id}")
             return instance
@@ -292,7 +314,8 @@ class BaseRepository(IRepository[T]):
             True if exists, False otherwise
         """
         try:
-            return self.get_queryset().filter(**filters).exists()
+            # No eager loading needed to test for a row
+            return self.model._default_manager.filter(**filters).exists()
         except Exception as e:
             logger.error(f"Error checking existence: {str(e)}")
             return False
@@ -308,7 +331,7 @@ class BaseRepository(IRepository[T]):
             Number of matching entities
         """
         try:
-            return self.get_queryset().filter(**filters).count()
+            return self.model._default_manager.filter(**filters).count()
         except Exception as e:
             logger.error(f"Error counting {self.model.__name__}: {str(e)}")
             return 0
@@ -388,6 +411,16 @@ class CachedRepository(BaseRepository[T]):
         super().__init__(model)
         self.cache_timeout = cache_timeout
         self._cache = None
+        # Bumping this counter orphans every key of the model at once
+        self._version_key = f"{model.__name__.lower()}:ver"
+        self._attnames = [f.attname for f in model._meta.concrete_fields]
+        # Drop cached lookups, misses included, however a row is written;
+        # one receiver per model since every repository of it shares keys
+        dispatch_uid = f"{model._meta.label_lower}:repository_cache"
+        post_save.connect(self._drop_cached_id, sender=model, weak=False,
+                          dispatch_uid=dispatch_uid)
+        post_delete.connect(self._drop_cached_id, sender=model, weak=False,
+                            dispatch_uid=dispatch_uid)
         
     @property
     def cache(self):
@@ -398,32 +431,70 @@ class CachedRepository(BaseRepository[T]):
         return self._cache
     
     def _get_cache_key(self, method: str, *args, **kwargs) -> str:
-        """Generate cache key."""
+        """Generate cache key under the model's current cache version."""
+        version = self.cache.get_or_set(self._version_key, 1, None)
         key_parts = [
             self.model.__name__.lower(),
+            str(version),
             method,
             str(args),
             str(sorted(kwargs.items()))
         ]
         return ':'.join(key_parts)
     
+    def _id_cache_key(self, id: Any) -> str:
+        """
+        Get the get_by_id cache key, normalising the id so 5 and '5' share it.
+        
+        Raises:
+            ValidationError: If the id is not a valid primary key value
+        """
+        return self._get_cache_key('get_by_id', self.model._meta.pk.to_python(id))
+    
+    def _drop_cached_id(self, sender, instance, **kwargs):
+        """Signal receiver deleting the cached get_by_id entry of a written row."""
+        self.cache.delete(self._id_cache_key(instance.pk))
+    
+    def _dump(self, instance: T) -> tuple:
+        """Reduce an instance to its column values for caching."""
+        return instance._state.db, tuple(
+            getattr(instance, attname) for attname in self._attnames
+        )
+    
+    def _load(self, data: tuple) -> T:
+        """Rebuild an instance cached by _dump as if loaded from the database."""
+        db, values = data
+        return self.model.from_db(db, self._attnames, values)
+    
     def get_by_id(self, id: Any) -> Optional[T]:
         """Get entity by ID with caching."""
-        cache_key = self._get_cache_key('get_by_id', id)
+        try:
+            cache_key = self._id_cache_key(id)
+        except ValidationError:
+            logger.warning(f"Invalid {self.model.__name__} id {id!r}")
+            return None
         
         # Try to get from cache
         cached = self.cache.get(cache_key)
         if cached is not None:
+            if cached == _MISS:
+                return None
             logger.debug(f"Cache hit for {self.model.__name__} id {id}")
-            return cached
+            return self._load(cached)
         
-        # Get from database
-        instance = super().get_by_id(id)
+        # Get from database; only a confirmed miss is remembered, briefly,
+        # so a transient database error never hides an existing row
+        try:
+            instance = self.get_queryset().get(pk=id)
+        except ObjectDoesNotExist:
+            logger.warning(f"{self.model.__name__} with id {id} not found")
+            self.cache.set(cache_key, _MISS, MISS_CACHE_TIMEOUT)
+            return None
+        except Exception as e:
+            logger.error(f"Error fetching {self.model.__name__} by id: {str(e)}")
+            return None
         
-        # Store in cache
-        if instance:
-            self.cache.set(cache_key, instance, self.cache_timeout)
-            
+        self.cache.set(cache_key, self._dump(instance), self.cache_timeout)
         return instance
     
     def invalidate_cache(self, method: str = None, *args, **kwargs):
@@ -435,10 +506,16 @@ class CachedRepository(BaseRepository[T]):
             *args: Method arguments
             **kwargs: Method keyword arguments
         """
-        if method:
+        if method == 'get_by_id' and args and not kwargs:
+            self.cache.delete(self._id_cache_key(args[0]))
+        elif method:
             cache_key = self._get_cache_key(method, *args, **kwargs)
             self.cache.delete(cache_key)
         else:
-            # Clear all cache for this model
-            pattern = f"{self.model.__name__.lower()}:*"
-            self.cache.delete_pattern(pattern)
+            # Clear all cache for this model; old entries expire by TTL
+            self.cache.get_or_set(self._version_key, 1, None)
+            try:
+                self.cache.incr(self._version_key)
+            except ValueError:
+                # Backend stores nothing (DummyCache), so nothing is stale
+                pass
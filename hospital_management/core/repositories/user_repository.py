@@ -38,12 +38,12 @@ class UserRepository(CachedRepository):
         # Check cache
         cached = self.cache.get(cache_key)
         if cached is not None:
-            return cached
+            return self._load(cached)
         
         try:
             user = self.model.objects.filter(so_dien_thoai=phone_number).first()
             if user:
-                self.cache.set(cache_key, user, self.cache_timeout)
+                self.cache.set(cache_key, self._dump(user), self.cache_timeout)
             return user
         except Exception as e:
             logger.error(f"Error finding user by phone: {str(e)}")
@@ -202,3 +202,7 @@ SPECTACULAR_SETTINGS = {
         'pathInMiddlePanel': True,
     },
 }
+
+# Monitoring and Health Check
+# Opt-in: keep the health status cache warm from a background thread in each worker
+HEALTH_CHECK_WARMUP = os.environ.get('HEALTH_CHECK_WARMUP', 'false').lower() == 'true'
@@ -43,6 +43,7 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.HealthCheckFastPathMiddleware',
     'core.middleware.RequestLoggingMiddleware',
     'core.middleware.ExceptionHandlingMiddleware',
     'core.middleware.PerformanceMonitoringMiddleware',
@@ -224,6 +225,9 @@ APP_VERSION = '2.0.0'
 API_VERSION = 'v1'
 
 # Monitoring and Health Check
+# Opt-in: keep the health status cache warm from a background thread in each worker
+HEALTH_CHECK_WARMUP = os.environ.get('HEALTH_CHECK_WARMUP', 'false').lower() == 'true'
+
 HEALTH_CHECK_APPS = [
     'health_check',
     'health_check.db',
@@ -6,10 +6,18 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from core.health_checks import healthz
+from core.health_check_urls import probe_urlpatterns
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     
+    # Liveness probe
+    path('healthz', healthz, name='healthz'),
+    
+    # Kubernetes probes; detailed health and metrics views are not mounted publicly
+    path('api/health/', include((probe_urlpatterns, 'health'))),
+    
     # API Documentation
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),